@@ -52,10 +52,14 @@ class AuthService:
 
     def logout(self):
         """
-        Deocamdată doar șterge sesiunea locală.
+        Deocamdată doar șterge sesiunea locală și cache-ul de login din UI.
         (Dacă vrei, mai târziu putem chema și /api/auth/logout.)
         """
+        # import local: ui_login_handler importă deja acest modul
+        from ui_login_handler import clear_login_cache
+
         self.session = None
+        clear_login_cache()
 
     def can_access_dashboard(self) -> bool:
         return self.session is not None and self.session.can_access_dashboard()
@@ -2,7 +2,9 @@
 # AT Command Engine for ADA-Pi
 # Provides a robust, reusable serial-based AT command interface
 
+import os
 import serial
+import select
 import time
 import threading
 from logger import logger
@@ -21,6 +23,9 @@ class ATCommandEngine:
     def __init__(self):
         self.port = None
         self.ser = None
+        self._fd = None
+        # Receive buffer reused across send() calls (guarded by self.lock)
+        self._rx = bytearray()
         self.lock = threading.Lock()
 
     # ------------------------------------------------------------
@@ -34,6 +39,11 @@ class ATCommandEngine:
                 write_timeout=1
             )
             self.port = port
+            # select() on the tty lets reads wake as soon as bytes arrive
+            try:
+                self._fd = self.ser.fileno()
+            except Exception:
+                self._fd = None
             logger.log("INFO", f"AT engine connected to {port}")
             return True
         except Exception as e:
@@ -47,14 +57,16 @@ class ATCommandEngine:
             if self.ser:
                 self.ser.close()
                 self.ser = None
+                self._fd = None
                 logger.log("INFO", "AT engine disconnected")
         except:
             pass
 
     # ------------------------------------------------------------
-    def send(self, command, timeout=2, strip_ok=True):
+    def send(self, command, timeout=2, strip_ok=True, raw=False):
         """
         Send AT command and return a list of response lines.
+        With raw=True the lines are returned as bytes, undecoded.
         """
 
         if self.ser is None:
@@ -68,30 +80,53 @@ class ATCommandEngine:
                 self.ser.reset_output_buffer()
 
                 # Send command
-                cmd = (command + "\r").encode()
-                self.ser.write(cmd)
+                cmd = command.encode()
+                self.ser.write(cmd + b"\r")
 
                 lines = []
-                t_end = time.time() + timeout
-
-                # Read response lines until timeout
-                while time.time() < t_end:
-                    line = self.ser.readline().decode(errors="ignore").strip()
-                    if not line:
-                        continue
-
-                    # Skip echo
-                    if line == command:
-                        continue
-
-                    # Stop on OK or ERROR
-                    if line == "OK" and strip_ok:
+                buf = self._rx
+                buf.clear()
+                done = False
+                t_end = time.monotonic() + timeout
+
+                # Read whatever is buffered in one go and split lines at bytes level
+                while not done:
+                    remaining = t_end - time.monotonic()
+                    if remaining <= 0:
                         break
 
-                    lines.append(line)
-
-                    if "ERROR" in line:
-                        break
+                    # Sleep in the kernel until data or the deadline, not the 1s port timeout,
+                    # then take whatever is there with one os.read (no pyserial read loop)
+                    if self._fd is not None:
+                        ready, _, _ = select.select([self._fd], [], [], remaining)
+                        if not ready:
+                            break
+                        try:
+                            chunk = os.read(self._fd, 4096)
+                        except BlockingIOError:
+                            continue
+                        if not chunk:
+                            # readable but empty: the device went away (USB unplug)
+                            raise serial.SerialException("device disconnected")
+                    else:
+                        chunk = self.ser.read(self.ser.in_waiting or 1)
+                        if not chunk:
+                            continue
+
+                    buf += chunk
+                    start = 0
+                    nl = buf.find(b"\n")
+                    while nl >= 0:
+                        if self._take_line(buf[start:nl], cmd, strip_ok, lines, raw):
+                            done = True
+                            break
+                        start = nl + 1
+                        nl = buf.find(b"\n", start)
+                    del buf[:start]
+
+                # Unterminated tail at timeout (readline used to return it too)
+                if not done and buf:
+                    self._take_line(buf, cmd, strip_ok, lines, raw)
 
                 return lines
 
@@ -100,6 +135,24 @@ class ATCommandEngine:
                 self.disconnect()
                 return []
 
+    @staticmethod
+    def _take_line(data, cmd, strip_ok, lines, raw=False):
+        """Collect one response line; returns True when the response is complete."""
+        line = data.strip()
+        if not line:
+            return False
+
+        # Skip echo
+        if line == cmd:
+            return False
+
+        # Stop on OK or ERROR
+        if line == b"OK" and strip_ok:
+            return True
+
+        lines.append(bytes(line) if raw else line.decode(errors="ignore"))
+        return b"ERROR" in line
+
     # ------------------------------------------------------------
     def test(self):
         """Send 'AT' to confirm modem is responsive."""
@@ -0,0 +1,30 @@
+# ADA-Pi Backend Module: json_codec.py
+# Shared JSON encoder: uses orjson when installed, stdlib json otherwise.
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _OPTIONS_INDENT = _OPTIONS | orjson.OPT_INDENT_2
+
+    def dumps(obj, indent=False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (compact, or 2-space indented)."""
+        return orjson.dumps(obj, option=_OPTIONS_INDENT if indent else _OPTIONS)
+
+    loads = orjson.loads
+
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    _encoder_indent = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+    def dumps(obj, indent=False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (compact, or 2-space indented)."""
+        return (_encoder_indent if indent else _encoder).encode(obj).encode()
+
+    loads = json.loads
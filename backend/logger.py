@@ -1,15 +1,35 @@
 # ADA-Pi Backend Module: Logger
 # Simple centralized logger for backend systems
 
+import os
 import time
 
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "ERROR": 40}
+
 class Logger:
     def __init__(self):
         self.entries = []
         self.max_entries = 500
+        self.threshold = LEVELS.get(os.getenv("ADA_LOG_LEVEL", "DEBUG").upper(), 10)
+        # (epoch second, formatted) - strftime runs at most once per second
+        self._ts = (None, "")
+
+    def set_level(self, level):
+        self.threshold = LEVELS.get(level, self.threshold)
+
+    def enabled_for(self, level):
+        """Cheap check so callers can skip building messages that would be dropped."""
+        return LEVELS.get(level, 20) >= self.threshold
 
     def log(self, level, message):
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        if LEVELS.get(level, 20) < self.threshold:
+            return
+
+        now = int(time.time())
+        ts = self._ts
+        if ts[0] != now:
+            ts = self._ts = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+        timestamp = ts[1]
         entry = f"[{timestamp}] [{level}] {message}"
         self.entries.append(entry)
 
@@ -58,6 +58,9 @@ class BackendEngine:
         # --------------------------------------------------------
         self.config = load_config()
 
+        # Set once on shutdown; workers that take it wake from their waits immediately
+        self.shutdown = threading.Event()
+
         # --------------------------------------------------------
         # INIT MODULES
         # --------------------------------------------------------
@@ -90,16 +93,16 @@ class BackendEngine:
         self.workers = [
             UPSWorker(self.modules["ups"]),
             NetworkWorker(self.modules["network"], modem_module=self.modules["modem"]),
-            ModemWorker(self.modules["modem"], self.config, gps_module=self.modules["gps"]),
+            ModemWorker(self.modules["modem"], self.config, gps_module=self.modules["gps"], shutdown=self.shutdown),
             # GPSWorker disabled - GPS in ModemWorker
             BluetoothWorker(self.modules["bluetooth"]),
-            LogsWorker(self.modules["logs"]),
+            LogsWorker(self.modules["logs"], self.storage, shutdown=self.shutdown),
             TachoWorker(self.modules["tacho"], self.modules["gps"]),
-            FanWorker(self.modules["fan"]),
+            FanWorker(self.modules["fan"], shutdown=self.shutdown),
             OBDWorker(self.modules["obd"], self.config),
             SystemInfoWorker(self.modules["system"]),
             TachoUploader(self.modules["tacho"], self.storage),
-            CloudUploader(self.modules, self.storage),
+            CloudUploader(self.modules, self.storage, shutdown=self.shutdown),
             RotationWorker(self.storage),
             OTAWorker(self.ota, self.storage)
         ]
@@ -161,6 +164,7 @@ class BackendEngine:
     # ------------------------------------------------------------
     def _shutdown(self, signum, frame):
         logger.log("WARN", f"Shutting down backend engine (signal={signum})")
+        self.shutdown.set()
 
         for worker, thread in self.threads:
             try:
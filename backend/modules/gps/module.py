@@ -1,8 +1,14 @@
 # ADA-Pi Backend Module: GPS Module
 # Provides GNSS data, satellite information, and automatic km/h/mph switching.
 
+import threading
+
+
 class GPSModule:
     def __init__(self):
+        # Guards a fix written by update_all() against read_status() on the API thread
+        self._lock = threading.Lock()
+
         # GNSS core data
         self.fix = False
         self.satellites = 0
@@ -23,18 +29,20 @@ class GPSModule:
     # STATUS (used by frontend)
     # ------------------------------------------------------------
     def read_status(self):
-        return {
-            "fix": self.fix,
-            "satellites": self.satellites,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "altitude": self.altitude,
-            "hdop": self.hdop,
-            "speed": self.get_speed(),
-            "unit": self.get_unit(),
-            "heading": self.heading,
-            "timestamp": self.timestamp
-        }
+        with self._lock:
+            speed, unit = self.speed_and_unit()
+            return {
+                "fix": self.fix,
+                "satellites": self.satellites,
+                "latitude": self.latitude,
+                "longitude": self.longitude,
+                "altitude": self.altitude,
+                "hdop": self.hdop,
+                "speed": speed,
+                "unit": unit,
+                "heading": self.heading,
+                "timestamp": self.timestamp
+            }
 
     # ------------------------------------------------------------
     # SATELLITE LIST
@@ -56,6 +64,22 @@ class GPSModule:
         if timestamp is not None:
             self.timestamp = timestamp
 
+    def update_all(self, lat, lon, alt, speed_kmh, satellites, fix, hdop=None, heading=None, timestamp=None):
+        """Write a whole fix under one lock so readers never see half of it"""
+        with self._lock:
+            self.latitude = lat
+            self.longitude = lon
+            self.altitude = alt
+            if hdop is not None:
+                self.hdop = hdop
+            if heading is not None:
+                self.heading = heading
+            if timestamp is not None:
+                self.timestamp = timestamp
+            self.speed_kmh = speed_kmh
+            self.satellites = satellites
+            self.fix = fix
+
     def update_fix(self, fix_state):
         self.fix = fix_state
 
@@ -78,10 +102,14 @@ class GPSModule:
 
     def get_speed(self):
         """Return speed in km/h or mph based on selected mode."""
+        return self.speed_and_unit()[0]
+
+    def speed_and_unit(self):
+        """Return (speed, unit) with the unit resolved once."""
         unit = self.get_unit()
         if unit == "mph":
-            return round(self.speed_kmh * 0.621371, 1)
-        return round(self.speed_kmh, 1)
+            return round(self.speed_kmh * 0.621371, 1), unit
+        return round(self.speed_kmh, 1), unit
 
     def set_unit_mode(self, mode):
         """User selection: auto / kmh / mph"""
@@ -3,12 +3,23 @@
 # monthly logs, and upload scheduling.
 
 import time
+from array import array
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
 
 class TachoModule:
     def __init__(self):
         self.enabled = False
         self.upload_interval = 5  # minutes
         self.last_upload = 0
+        # last_upload + upload_interval, kept in step by the two setters below
+        self._next_upload = self.upload_interval * 60
 
         # live data
         self.speed = 0.0
@@ -17,7 +28,11 @@ class TachoModule:
 
         # logs
         self.speed_history = []      # last N values
-        self.daily_log = []          # full day list of points
+        # full day of points, stored column-wise (one typed array per field)
+        self.daily_t = array("d")
+        self.daily_speed = array("d")
+        self.daily_lat = array("d")
+        self.daily_lon = array("d")
         self.monthly_log = []        # monthly summaries
 
     def update_position(self, speed, lat, lon):
@@ -33,32 +48,45 @@ class TachoModule:
         if len(self.speed_history) > 200:
             self.speed_history.pop(0)
 
-        # Append to daily log
-        self.daily_log.append({
-            "t": timestamp,
-            "speed": speed,
-            "lat": lat,
-            "lon": lon
-        })
+        # Append to daily log: one value per column every tick, NaN for a
+        # field that won't convert, so the four columns stay the same length
+        self.daily_t.append(timestamp)
+        self.daily_speed.append(_as_float(speed))
+        self.daily_lat.append(_as_float(lat))
+        self.daily_lon.append(_as_float(lon))
 
     def set_enabled(self, state: bool):
         self.enabled = state
 
     def set_upload_interval(self, minutes: int):
         self.upload_interval = minutes
+        self._next_upload = self.last_upload + minutes * 60
 
     def should_upload(self):
         """Returns True if time since last upload > interval."""
-        return (time.time() - self.last_upload) > (self.upload_interval * 60)
+        return time.time() > self._next_upload
 
     def mark_uploaded(self):
         self.last_upload = time.time()
+        self._next_upload = self.last_upload + self.upload_interval * 60
 
     def get_speed_history(self):
         return self.speed_history
 
     def get_daily_log(self):
-        return self.daily_log
+        """Materialize the column store as a list of point dicts."""
+        return [
+            {"t": t, "speed": speed, "lat": lat, "lon": lon}
+            for t, speed, lat, lon in zip(
+                self.daily_t, self.daily_speed, self.daily_lat, self.daily_lon
+            )
+        ]
+
+    def clear_daily_log(self):
+        del self.daily_t[:]
+        del self.daily_speed[:]
+        del self.daily_lat[:]
+        del self.daily_lon[:]
 
     def get_monthly_log(self):
         return self.monthly_log
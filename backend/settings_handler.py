@@ -7,12 +7,60 @@ Tracks settings version to avoid reapplying unchanged settings.
 
 import os
 import json
+import hashlib
 from logger import logger
 from config_manager import load_config, save_config
 from ipc.router import router
 
 SETTINGS_VERSION_FILE = "/var/lib/ada_pi/settings_version"
 
+# Sections in the order they are applied.
+SECTION_ORDER = ("cloud", "wifi", "bluetooth", "modem", "gps", "obd", "ups", "fan", "system")
+
+# Plain sections: each config key is copied from the server payload,
+# falling back to the default. Sections with special merge rules
+# or side effects have an _apply_<name> method, run before the schema.
+SECTION_SCHEMA = {
+    "wifi": (
+        ("enabled", True),
+        ("ssid", ""),
+        ("password", ""),
+        ("dhcp", True),
+        ("ip", ""),
+        ("gateway", ""),
+        ("dns", ""),
+    ),
+    "bluetooth": (
+        ("enabled", True),
+        ("discoverable", False),
+        ("name", ""),
+    ),
+    "gps": (
+        ("enabled", True),
+        ("update_rate", 1),
+    ),
+    # Connection type: bluetooth, usb, or none
+    "obd": (
+        ("enabled", True),
+        ("connection", "bluetooth"),
+        ("bluetooth_mac", ""),
+        ("usb_port", "/dev/ttyUSB0"),
+        ("protocol", "auto"),
+        ("poll_interval", 2),
+    ),
+    "fan": (
+        ("mode", "auto"),
+        ("threshold", 50),
+        ("speed", 100),
+    ),
+    "system": (
+        ("timezone", "UTC"),
+        ("hostname", ""),
+        ("auto_update", False),
+        ("reboot_schedule", "disabled"),
+    ),
+}
+
 
 class SettingsHandler:
     """
@@ -25,6 +73,9 @@ class SettingsHandler:
 
     def __init__(self):
         self._local_version = self._load_local_version()
+        # Digest of each section as last applied, so unchanged sections
+        # are neither re-merged nor re-announced to their modules.
+        self._section_hashes: dict[str, bytes] = {}
 
     # ----------------------------------------------------------------
     # VERSION TRACKING
@@ -75,7 +126,8 @@ class SettingsHandler:
 
         # Check if we need to update
         if server_version <= self._local_version:
-            logger.log("DEBUG", f"SettingsHandler: settings up to date (local={self._local_version}, server={server_version})")
+            if logger.enabled_for("DEBUG"):
+                logger.log("DEBUG", f"SettingsHandler: settings up to date (local={self._local_version}, server={server_version})")
             return False
 
         logger.log("INFO", f"SettingsHandler: applying new settings (version {server_version})")
@@ -84,22 +136,22 @@ class SettingsHandler:
             # Load current config
             cfg = load_config()
 
-            # Apply each section
-            self._apply_cloud(cfg, settings_data.get("cloud", {}))
-            self._apply_wifi(cfg, settings_data.get("wifi", {}))
-            self._apply_bluetooth(cfg, settings_data.get("bluetooth", {}))
-            self._apply_modem(cfg, settings_data.get("modem", {}))
-            self._apply_gps(cfg, settings_data.get("gps", {}))
-            self._apply_obd(cfg, settings_data.get("obd", {}))
-            self._apply_ups(cfg, settings_data.get("ups", {}))
-            self._apply_fan(cfg, settings_data.get("fan", {}))
-            self._apply_system(cfg, settings_data.get("system", {}))
+            # Apply each section (skipping those unchanged since last apply)
+            applied = {}
+            for name in SECTION_ORDER:
+                section = settings_data.get(name, {})
+                digest = self._section_digest(section)
+                if self._section_hashes.get(name) == digest:
+                    continue
+                self._apply_section(cfg, name, section)
+                applied[name] = digest
 
             # Save updated config
             save_config(cfg)
 
             # Save version
             self._save_local_version(server_version)
+            self._section_hashes.update(applied)
 
             # Notify all modules that config changed
             router.publish("config_changed", {"version": server_version})
@@ -111,150 +163,60 @@ class SettingsHandler:
             logger.log("ERROR", f"SettingsHandler: failed to apply settings: {e}")
             return False
 
+    @staticmethod
+    def _section_digest(section: dict) -> bytes:
+        """Cheap fingerprint of a settings section (canonical JSON)."""
+        canonical = json.dumps(section, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
     # ----------------------------------------------------------------
     # SECTION APPLIERS
     # ----------------------------------------------------------------
 
-    def _apply_cloud(self, cfg: dict, cloud: dict):
-        """Apply cloud upload settings."""
-        if not cloud:
+    def _apply_section(self, cfg: dict, name: str, section: dict):
+        """Apply one settings section and notify its module."""
+        if not section:
             return
-        
-        if "cloud" not in cfg:
-            cfg["cloud"] = {}
-        
-        if cloud.get("upload_url"):
-            cfg["cloud"]["upload_url"] = cloud["upload_url"]
-        if cloud.get("logs_url"):
-            cfg["cloud"]["logs_url"] = cloud["logs_url"]
 
-    def _apply_wifi(self, cfg: dict, wifi: dict):
-        """Apply WiFi settings - actual connection handled by NetworkManager."""
-        if not wifi:
-            return
-        
-        if "wifi" not in cfg:
-            cfg["wifi"] = {}
-        
-        cfg["wifi"]["enabled"] = wifi.get("enabled", True)
-        cfg["wifi"]["ssid"] = wifi.get("ssid", "")
-        cfg["wifi"]["password"] = wifi.get("password", "")
-        cfg["wifi"]["dhcp"] = wifi.get("dhcp", True)
-        cfg["wifi"]["ip"] = wifi.get("ip", "")
-        cfg["wifi"]["gateway"] = wifi.get("gateway", "")
-        cfg["wifi"]["dns"] = wifi.get("dns", "")
-
-        # Notify network module to reconfigure WiFi
-        router.publish("wifi_config_changed", wifi)
-
-    def _apply_bluetooth(self, cfg: dict, bt: dict):
-        """Apply Bluetooth settings."""
-        if not bt:
-            return
-        
-        if "bluetooth" not in cfg:
-            cfg["bluetooth"] = {}
-        
-        cfg["bluetooth"]["enabled"] = bt.get("enabled", True)
-        cfg["bluetooth"]["discoverable"] = bt.get("discoverable", False)
-        cfg["bluetooth"]["name"] = bt.get("name", "")
-
-        router.publish("bluetooth_config_changed", bt)
+        dst = cfg.setdefault(name, {})
 
-    def _apply_modem(self, cfg: dict, modem: dict):
-        """Apply modem/cellular settings."""
-        if not modem:
-            return
-        
-        if "modem" not in cfg:
-            cfg["modem"] = {}
-        
-        cfg["modem"]["apn"] = modem.get("apn") or cfg["modem"].get("apn", "")
-        cfg["modem"]["apn_username"] = modem.get("username") or modem.get("apn_username") or cfg["modem"].get("apn_username", "")
-        cfg["modem"]["apn_password"] = modem.get("password") or modem.get("apn_password") or cfg["modem"].get("apn_password", "")
-        cfg["modem"]["network_mode"] = modem.get("network_mode", "auto")
-        cfg["modem"]["roaming"] = modem.get("roaming", False)
-        cfg["modem"]["failover_enabled"] = modem.get("failover_enabled", True)
-
-        router.publish("modem_config_changed", modem)
-
-    def _apply_gps(self, cfg: dict, gps: dict):
-        """Apply GPS settings."""
-        if not gps:
-            return
-        
-        if "gps" not in cfg:
-            cfg["gps"] = {}
-        
-        cfg["gps"]["enabled"] = gps.get("enabled", True)
-        cfg["gps"]["update_rate"] = gps.get("update_rate", 1)
+        custom = getattr(self, f"_apply_{name}", None)
+        if custom is not None:
+            custom(dst, section)
+        if name in SECTION_SCHEMA:
+            dst.update({key: section.get(key, default) for key, default in SECTION_SCHEMA[name]})
 
-        router.publish("gps_config_changed", gps)
+        # Cloud URLs are read from config directly; nothing to notify
+        if name != "cloud":
+            router.publish(f"{name}_config_changed", section)
 
-    def _apply_obd(self, cfg: dict, obd: dict):
-        """Apply OBD settings."""
-        if not obd:
-            return
-        
-        if "obd" not in cfg:
-            cfg["obd"] = {}
-        
-        # Connection type: bluetooth, usb, or none
-        cfg["obd"]["enabled"] = obd.get("enabled", True)
-        cfg["obd"]["connection"] = obd.get("connection", "bluetooth")
-        cfg["obd"]["bluetooth_mac"] = obd.get("bluetooth_mac", "")
-        cfg["obd"]["usb_port"] = obd.get("usb_port", "/dev/ttyUSB0")
-        cfg["obd"]["protocol"] = obd.get("protocol", "auto")
-        cfg["obd"]["poll_interval"] = obd.get("poll_interval", 2)
-
-        router.publish("obd_config_changed", obd)
-
-    def _apply_ups(self, cfg: dict, ups: dict):
-        """Apply UPS/battery settings."""
-        if not ups:
-            return
-        
-        if "ups" not in cfg:
-            cfg["ups"] = {}
-        
-        # UPS type: x1202, wittypi, generic, none
+    def _apply_cloud(self, dst: dict, cloud: dict):
+        """Cloud upload URLs are only overwritten when provided."""
+        if cloud.get("upload_url"):
+            dst["upload_url"] = cloud["upload_url"]
+        if cloud.get("logs_url"):
+            dst["logs_url"] = cloud["logs_url"]
+
+    def _apply_modem(self, dst: dict, modem: dict):
+        """Modem credentials accept both server field names and keep existing values."""
+        dst["apn"] = modem.get("apn") or dst.get("apn", "")
+        dst["apn_username"] = modem.get("username") or modem.get("apn_username") or dst.get("apn_username", "")
+        dst["apn_password"] = modem.get("password") or modem.get("apn_password") or dst.get("apn_password", "")
+        dst["network_mode"] = modem.get("network_mode", "auto")
+        dst["roaming"] = modem.get("roaming", False)
+        dst["failover_enabled"] = modem.get("failover_enabled", True)
+
+    def _apply_ups(self, dst: dict, ups: dict):
+        """UPS type (x1202, wittypi, generic, none) is only overwritten when provided."""
         if ups.get("type"):
-            cfg["ups"]["type"] = ups["type"]
-        
-        cfg["ups"]["shutdown_pct"] = ups.get("low_threshold", ups.get("shutdown_pct", 15))
-        cfg["ups"]["auto_power_on"] = ups.get("auto_power_on", True)
-        cfg["ups"]["shutdown_delay"] = ups.get("shutdown_delay", 30)
+            dst["type"] = ups["type"]
 
-        router.publish("ups_config_changed", ups)
+        dst["shutdown_pct"] = ups.get("low_threshold", ups.get("shutdown_pct", 15))
+        dst["auto_power_on"] = ups.get("auto_power_on", True)
+        dst["shutdown_delay"] = ups.get("shutdown_delay", 30)
 
-    def _apply_fan(self, cfg: dict, fan: dict):
-        """Apply fan control settings."""
-        if not fan:
-            return
-        
-        if "fan" not in cfg:
-            cfg["fan"] = {}
-        
-        cfg["fan"]["mode"] = fan.get("mode", "auto")
-        cfg["fan"]["threshold"] = fan.get("threshold", 50)
-        cfg["fan"]["speed"] = fan.get("speed", 100)
-
-        router.publish("fan_config_changed", fan)
-
-    def _apply_system(self, cfg: dict, system: dict):
-        """Apply system-wide settings."""
-        if not system:
-            return
-        
-        if "system" not in cfg:
-            cfg["system"] = {}
-        
-        cfg["system"]["timezone"] = system.get("timezone", "UTC")
-        cfg["system"]["hostname"] = system.get("hostname", "")
-        cfg["system"]["auto_update"] = system.get("auto_update", False)
-        cfg["system"]["reboot_schedule"] = system.get("reboot_schedule", "disabled")
-
-        # Apply timezone immediately if changed
+    def _apply_system(self, dst: dict, system: dict):
+        """Apply timezone/hostname to the OS immediately."""
         tz = system.get("timezone")
         if tz:
             try:
@@ -262,7 +224,6 @@ class SettingsHandler:
             except:
                 pass
 
-        # Apply hostname if changed
         hostname = system.get("hostname")
         if hostname:
             try:
@@ -270,8 +231,6 @@ class SettingsHandler:
             except:
                 pass
 
-        router.publish("system_config_changed", system)
-
 
 # Singleton instance
 settings_handler = SettingsHandler()
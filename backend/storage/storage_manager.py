@@ -1,8 +1,29 @@
 import os
+import re
 import time
 import json
-from datetime import datetime, timedelta
+import atexit
+import operator
+import threading
+from datetime import date, datetime, timedelta
 import shutil
+import tempfile
+
+import json_codec
+from logger import logger
+
+
+_TACHO_HEADER = "timestamp,latitude,longitude,speed_kmh,rpm,obd_speed,temp_coolant\n"
+
+# snapshot dict keys in CSV column order (after the timestamp)
+_TACHO_FIELDS = ("lat", "lon", "speed", "rpm", "obd_speed", "coolant_temp")
+_tacho_values = operator.itemgetter(*_TACHO_FIELDS)
+_tacho_line = "{:d},{},{},{},{},{},{}\n".format
+
+# tacho log file names
+_DAILY_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})\.csv$")
+_WEEK_RE = re.compile(r"^week_(\d{4})-W(\d{2})\.csv$")
+_MONTH_RE = re.compile(r"^month_(\d{4})-(\d{2})\.csv$")
 
 
 class StorageManager:
@@ -27,6 +48,8 @@ class StorageManager:
     TMP_DIR = os.path.join(BASE_DIR, "tmp")
 
     META_FILE = os.path.join(TACHO_DIR, "upload_status.json")
+    META_LOG_FILE = os.path.join(TACHO_DIR, "upload_status.log")
+    META_CHECKPOINT_EVERY = 100  # marks between full JSON snapshots
 
     # rotation rules
     DAILY_MAX_AGE = 30          # days
@@ -34,34 +57,88 @@ class StorageManager:
     MONTHLY_MAX_AGE = 365       # days
     YEARLY_MAX_AGE = 99999      # never delete
 
+    # daily CSV write batching
+    DAILY_FLUSH_LINES = 64      # flush buffered lines after this many records
+    DAILY_FLUSH_SECONDS = 1.0   # ... or once this much time has passed
+    DAILY_FSYNC_EVERY = 10      # fsync once per this many flushes
+
     def __init__(self):
         self._ensure_directories()
+
+        # upload_status.json is a periodic snapshot; marks since then are
+        # appended to upload_status.log and replayed on load
+        self._meta_lock = threading.Lock()
         self.meta = self._load_meta()
+        self._cats = {c: self.meta.setdefault(c, {}) for c in ("daily", "weekly", "monthly", "yearly")}
+        self._meta_log_fp = open(self.META_LOG_FILE, "a")
+        self._meta_dirty = 0
+
+        # open append handle for the current daily CSV + pending lines
+        self._daily_lock = threading.Lock()
+        self._daily_fp = None
+        self._daily_date = None
+        self._daily_buf = []
+        self._daily_last_flush = 0.0
+        self._daily_flushes = 0
+
+        atexit.register(self.close)
 
     # ------------------------------------------------------------
     # METADATA
     # ------------------------------------------------------------
 
     def _load_meta(self):
-        if not os.path.exists(self.META_FILE):
-            return {"daily": {}, "weekly": {}, "monthly": {}, "yearly": {}}
+        meta = {"daily": {}, "weekly": {}, "monthly": {}, "yearly": {}}
+
+        if os.path.exists(self.META_FILE):
+            try:
+                with open(self.META_FILE, "r") as f:
+                    meta = json.load(f)
+            except:
+                pass
 
+        # replay marks recorded since the last snapshot
         try:
-            with open(self.META_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {"daily": {}, "weekly": {}, "monthly": {}, "yearly": {}}
+            with open(self.META_LOG_FILE, "r") as f:
+                for line in f:
+                    category, sep, filename = line.rstrip("\n").partition("\t")
+                    if sep and filename:
+                        meta.setdefault(category, {})[filename] = True
+        except FileNotFoundError:
+            pass
+
+        return meta
 
     def _save_meta(self):
-        with open(self.META_FILE, "w") as f:
-            json.dump(self.meta, f, indent=2)
+        """Write a full snapshot and truncate the mark log (caller holds _meta_lock)."""
+        tmp = self.META_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json_codec.dumps(self.meta, indent=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.META_FILE)
+
+        self._meta_log_fp.truncate(0)
+        self._meta_dirty = 0
 
     def mark_uploaded(self, category, filename):
-        self.meta.setdefault(category, {})[filename] = True
-        self._save_meta()
+        with self._meta_lock:
+            self._cats[category][filename] = True
+
+            self._meta_log_fp.write(f"{category}\t{filename}\n")
+            self._meta_log_fp.flush()
+            self._meta_dirty += 1
+
+            if self._meta_dirty >= self.META_CHECKPOINT_EVERY:
+                self._save_meta()
 
     def is_uploaded(self, category, filename):
-        return self.meta.get(category, {}).get(filename, False)
+        return filename in self._cats[category]
+
+    def get_uploaded_set(self, category):
+        """Snapshot of uploaded filenames for one category, for bulk membership checks."""
+        with self._meta_lock:
+            return frozenset(self._cats[category])
 
     # ------------------------------------------------------------
     # DIRECTORIES
@@ -84,60 +161,203 @@ class StorageManager:
     def save_tacho_snapshot(self, data: dict):
         """
         Save tacho data to DAILY log CSV.
+
+        Lines are buffered and written in batches to a handle kept open
+        for the current day; call flush_daily() to force them out.
         """
         date = datetime.now().strftime("%Y-%m-%d")
         filename = os.path.join(self.TACHO_DIR, f"{date}.csv")
 
-        header = (
-            "timestamp,latitude,longitude,speed_kmh,"
-            "rpm,obd_speed,temp_coolant\n"
-        )
-
-        # create new file with header
-        if not os.path.exists(filename):
-            with open(filename, "w") as f:
-                f.write(header)
-
-        line = (
-            f"{int(time.time())},"
-            f"{data.get('lat')},"
-            f"{data.get('lon')},"
-            f"{data.get('speed')},"
-            f"{data.get('rpm')},"
-            f"{data.get('obd_speed')},"
-            f"{data.get('coolant_temp')}\n"
-        )
-
-        with open(filename, "a") as f:
-            f.write(line)
+        try:
+            values = _tacho_values(data)
+        except KeyError:
+            # missing fields are written as None, as before
+            values = tuple(map(data.get, _TACHO_FIELDS))
+        line = _tacho_line(int(time.time()), *values)
+
+        with self._daily_lock:
+            if date != self._daily_date:
+                self._open_daily(date, filename)
+
+            self._daily_buf.append(line)
+
+            if (len(self._daily_buf) >= self.DAILY_FLUSH_LINES or
+                    time.monotonic() - self._daily_last_flush >= self.DAILY_FLUSH_SECONDS):
+                self._flush_daily_locked()
 
         return filename
 
+    def _open_daily(self, date, filename):
+        """Switch the open daily handle to a new date (caller holds the lock)."""
+        self._close_daily_locked()
+
+        # append handle starts at EOF: position 0 means new/empty file
+        self._daily_fp = open(filename, "a", buffering=1 << 16)
+        if self._daily_fp.tell() == 0:
+            self._daily_fp.write(_TACHO_HEADER)
+
+        self._daily_date = date
+        self._daily_last_flush = time.monotonic()
+
+    def _flush_daily_locked(self, sync=False):
+        fp = self._daily_fp
+        if fp is None:
+            return
+
+        if self._daily_buf:
+            fp.writelines(self._daily_buf)
+            self._daily_buf.clear()
+        fp.flush()
+
+        self._daily_flushes += 1
+        if sync or self._daily_flushes >= self.DAILY_FSYNC_EVERY:
+            os.fsync(fp.fileno())
+            self._daily_flushes = 0
+
+        self._daily_last_flush = time.monotonic()
+
+    def _close_daily_locked(self):
+        if self._daily_fp is None:
+            return
+        try:
+            self._flush_daily_locked(sync=True)
+        finally:
+            self._daily_fp.close()
+            self._daily_fp = None
+            self._daily_date = None
+
+    def flush_daily(self):
+        """Write out and fsync any buffered daily CSV lines."""
+        with self._daily_lock:
+            self._flush_daily_locked(sync=True)
+
+    def close(self):
+        """Flush the daily CSV handle and checkpoint upload metadata."""
+        with self._daily_lock:
+            self._close_daily_locked()
+
+        with self._meta_lock:
+            if self._meta_dirty:
+                self._save_meta()
+
     # ------------------------------------------------------------
     # LISTING LOGS
     # ------------------------------------------------------------
 
-    def get_daily_logs(self):
-        return sorted([f for f in os.listdir(self.TACHO_DIR) if f.endswith(".csv")])
+    _SCAN_PREFIXES = (("week_", "weekly"), ("month_", "monthly"), ("year_", "yearly"))
+
+    def _scan_tacho(self):
+        """
+        Classify the tacho directory in a single scandir pass.
+
+        Returns {"daily"|"weekly"|"monthly"|"yearly": [(name, path, mtime), ...]},
+        each bucket sorted by name. mtime comes from the DirEntry stat cache.
+        """
+        buckets = {"daily": [], "weekly": [], "monthly": [], "yearly": []}
+
+        with os.scandir(self.TACHO_DIR) as it:
+            for entry in it:
+                name = entry.name
+                for prefix, category in self._SCAN_PREFIXES:
+                    if name.startswith(prefix):
+                        break
+                else:
+                    if not name.endswith(".csv"):
+                        continue
+                    category = "daily"
+                buckets[category].append((name, entry.path, entry.stat().st_mtime))
+
+        for items in buckets.values():
+            items.sort()
+        return buckets
+
+    def get_daily_logs(self, scan=None):
+        return [name for name, _, _ in (scan or self._scan_tacho())["daily"]]
 
-    def get_weekly_logs(self):
-        return sorted([f for f in os.listdir(self.TACHO_DIR) if f.startswith("week_")])
+    def get_weekly_logs(self, scan=None):
+        return [name for name, _, _ in (scan or self._scan_tacho())["weekly"]]
 
-    def get_monthly_logs(self):
-        return sorted([f for f in os.listdir(self.TACHO_DIR) if f.startswith("month_")])
+    def get_monthly_logs(self, scan=None):
+        return [name for name, _, _ in (scan or self._scan_tacho())["monthly"]]
 
-    def get_yearly_logs(self):
-        return sorted([f for f in os.listdir(self.TACHO_DIR) if f.startswith("year_")])
+    def get_yearly_logs(self, scan=None):
+        return [name for name, _, _ in (scan or self._scan_tacho())["yearly"]]
 
     # ------------------------------------------------------------
     # HELPER: APPEND CSV FILE INTO ANOTHER
     # ------------------------------------------------------------
 
-    def _append_csv(self, source, dest):
-        with open(dest, "a") as out, open(source, "r") as src:
-            next(src)  # skip header
-            for line in src:
-                out.write(line)
+    def _append_csv(self, source, dest, offset=0):
+        """
+        Append source's rows to dest, copying in-kernel where possible.
+
+        Copying starts at byte `offset` (0 = from the first row, skipping
+        the header). Returns the source offset copied up to, so the next
+        call only appends rows written since.
+        """
+        with open(source, "rb") as src:
+            size = os.fstat(src.fileno()).st_size
+
+            # source was recreated/truncated since last copy: start over
+            if offset > size:
+                offset = 0
+
+            if offset == 0:
+                src.readline()  # skip header
+                offset = src.tell()
+            if offset >= size:
+                return offset
+
+            with open(dest, "ab") as out:
+                remaining = size - offset
+                try:
+                    while remaining > 0:
+                        sent = os.sendfile(out.fileno(), src.fileno(), offset, remaining)
+                        if sent == 0:
+                            break
+                        offset += sent
+                        remaining -= sent
+                except (AttributeError, OSError):
+                    # no sendfile for regular files on this platform
+                    src.seek(offset)
+                    shutil.copyfileobj(src, out, length=1 << 20)
+                    offset = size
+
+        return offset
+
+    @staticmethod
+    def _create_with_header_if_missing(path):
+        """Atomically create path with the CSV header; False if it already exists."""
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        try:
+            os.write(fd, _TACHO_HEADER.encode())
+        finally:
+            os.close(fd)
+        return True
+
+    # ------------------------------------------------------------
+    # ROTATION LEDGER
+    # ------------------------------------------------------------
+
+    def _rotation_ledger(self, key, sources):
+        """
+        Return a private copy of {source filename: bytes already appended}
+        for one rotation step, without entries whose source file no longer
+        exists. self.meta is shared with the uploader thread, so it is only
+        touched under _meta_lock; the copy goes back via _save_rotation_ledger.
+        """
+        present = set(sources)
+        with self._meta_lock:
+            ledger = self.meta.get("rotated", {}).get(key, {})
+            return {name: done for name, done in ledger.items() if name in present}
+
+    def _save_rotation_ledger(self, key, ledger):
+        with self._meta_lock:
+            self.meta.setdefault("rotated", {})[key] = ledger
+            self._save_meta()
 
     # ------------------------------------------------------------
     # ROTATION: DAILY → WEEKLY
@@ -148,86 +368,86 @@ class StorageManager:
         Creates a weekly CSV based on ISO week numbers.
         Example: week_2025-W07.csv
         """
-        daily_logs = self.get_daily_logs()
-
-        for file in daily_logs:
-            date_str = file.replace(".csv", "")
+        self.flush_daily()
+        tacho_dir = self.TACHO_DIR
+        daily_logs = self._scan_tacho()["daily"]
+        ledger = self._rotation_ledger("daily->weekly", [f for f, _, _ in daily_logs])
+
+        for file, daily_path, _ in daily_logs:
+            m = _DAILY_RE.match(file)
+            if not m:
+                continue
             try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            except:
+                date_obj = date(*map(int, m.groups()))
+            except ValueError:
                 continue
 
             iso_year, iso_week, _ = date_obj.isocalendar()
             weekly_filename = f"week_{iso_year}-W{iso_week:02d}.csv"
-            weekly_path = os.path.join(self.TACHO_DIR, weekly_filename)
+            weekly_path = f"{tacho_dir}/{weekly_filename}"
 
             # create weekly file with header if not exists
-            if not os.path.exists(weekly_path):
-                with open(weekly_path, "w") as f:
-                    f.write("timestamp,latitude,longitude,speed_kmh,rpm,obd_speed,temp_coolant\n")
+            self._create_with_header_if_missing(weekly_path)
+
+            # append only rows not yet rotated
+            ledger[file] = self._append_csv(daily_path, weekly_path, ledger.get(file, 0))
 
-            # append content
-            daily_path = os.path.join(self.TACHO_DIR, file)
-            self._append_csv(daily_path, weekly_path)
+        self._save_rotation_ledger("daily->weekly", ledger)
 
     # ------------------------------------------------------------
     # ROTATION: WEEKLY → MONTHLY
     # ------------------------------------------------------------
 
     def rotate_weekly_to_monthly(self):
-        weekly_logs = self.get_weekly_logs()
+        tacho_dir = self.TACHO_DIR
+        weekly_logs = self._scan_tacho()["weekly"]
+        ledger = self._rotation_ledger("weekly->monthly", [f for f, _, _ in weekly_logs])
 
-        for file in weekly_logs:
+        for file, weekly_path, _ in weekly_logs:
             # parse ISO week file name
-            try:
-                _, year_week = file.split("_")
-                year_str, week_str = year_week.replace(".csv", "").split("-W")
-                year = int(year_str)
-                week = int(week_str)
-            except:
+            m = _WEEK_RE.match(file)
+            if not m:
                 continue
 
             # determine first day of ISO week
-            week_start = datetime.strptime(f"{year}-W{week}-1", "%G-W%V-%u")
+            try:
+                week_start = date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1)
+            except ValueError:
+                continue
 
-            month_str = week_start.strftime("%Y-%m")
-            monthly_filename = f"month_{month_str}.csv"
-            monthly_path = os.path.join(self.TACHO_DIR, monthly_filename)
+            monthly_filename = f"month_{week_start.year}-{week_start.month:02d}.csv"
+            monthly_path = f"{tacho_dir}/{monthly_filename}"
 
             # create with header if needed
-            if not os.path.exists(monthly_path):
-                with open(monthly_path, "w") as f:
-                    f.write("timestamp,latitude,longitude,speed_kmh,rpm,obd_speed,temp_coolant\n")
+            self._create_with_header_if_missing(monthly_path)
+
+            # append only rows not yet rotated
+            ledger[file] = self._append_csv(weekly_path, monthly_path, ledger.get(file, 0))
 
-            # append
-            weekly_path = os.path.join(self.TACHO_DIR, file)
-            self._append_csv(weekly_path, monthly_path)
+        self._save_rotation_ledger("weekly->monthly", ledger)
 
     # ------------------------------------------------------------
     # ROTATION: MONTHLY → YEARLY
     # ------------------------------------------------------------
 
     def rotate_monthly_to_yearly(self):
-        monthly_logs = self.get_monthly_logs()
+        tacho_dir = self.TACHO_DIR
+        monthly_logs = self._scan_tacho()["monthly"]
+        ledger = self._rotation_ledger("monthly->yearly", [f for f, _, _ in monthly_logs])
 
-        for file in monthly_logs:
-            try:
-                _, ym_str = file.split("_")
-                ym_str = ym_str.replace(".csv", "")
-                year_str, month_str = ym_str.split("-")
-                year = int(year_str)
-            except:
+        for file, monthly_path, _ in monthly_logs:
+            m = _MONTH_RE.match(file)
+            if not m:
                 continue
 
-            yearly_filename = f"year_{year}.csv"
-            yearly_path = os.path.join(self.TACHO_DIR, yearly_filename)
+            yearly_filename = f"year_{m.group(1)}.csv"
+            yearly_path = f"{tacho_dir}/{yearly_filename}"
 
-            if not os.path.exists(yearly_path):
-                with open(yearly_path, "w") as f:
-                    f.write("timestamp,latitude,longitude,speed_kmh,rpm,obd_speed,temp_coolant\n")
+            self._create_with_header_if_missing(yearly_path)
 
-            monthly_path = os.path.join(self.TACHO_DIR, file)
-            self._append_csv(monthly_path, yearly_path)
+            ledger[file] = self._append_csv(monthly_path, yearly_path, ledger.get(file, 0))
+
+        self._save_rotation_ledger("monthly->yearly", ledger)
 
     # ------------------------------------------------------------
     # CLEANUP / DELETION RULES
@@ -235,41 +455,39 @@ class StorageManager:
 
     def delete_old_logs(self):
         now = time.time()
+        scan = self._scan_tacho()
 
-        # DAILY
-        for file in self.get_daily_logs():
-            path = os.path.join(self.TACHO_DIR, file)
-            age_days = (now - os.path.getmtime(path)) / 86400
-
-            if self.is_uploaded("daily", file) or age_days > self.DAILY_MAX_AGE:
-                try:
-                    os.remove(path)
-                except:
-                    pass
+        # collect everything first, then unlink in one pass
+        victims = []
 
-        # WEEKLY
-        for file in self.get_weekly_logs():
-            path = os.path.join(self.TACHO_DIR, file)
-            age_days = (now - os.path.getmtime(path)) / 86400
-
-            if self.is_uploaded("weekly", file) or age_days > self.WEEKLY_MAX_AGE:
-                try:
-                    os.remove(path)
-                except:
-                    pass
-
-        # MONTHLY
-        for file in self.get_monthly_logs():
-            path = os.path.join(self.TACHO_DIR, file)
-            age_days = (now - os.path.getmtime(path)) / 86400
-
-            if self.is_uploaded("monthly", file) or age_days > self.MONTHLY_MAX_AGE:
-                try:
-                    os.remove(path)
-                except:
-                    pass
+        # today's CSV is held open by save_tacho_snapshot; unlinking it would
+        # send every later write of the day to an orphaned inode
+        with self._daily_lock:
+            open_daily = f"{self._daily_date}.csv" if self._daily_date else None
 
         # YEARLY — NEVER auto delete
+        for category, max_age in (
+            ("daily", self.DAILY_MAX_AGE),
+            ("weekly", self.WEEKLY_MAX_AGE),
+            ("monthly", self.MONTHLY_MAX_AGE),
+        ):
+            uploaded = self._cats[category]
+            victims.extend(
+                path for file, path, mtime in scan[category]
+                if file != open_daily and (file in uploaded or (now - mtime) / 86400 > max_age)
+            )
+
+        self._unlink_all(victims)
+
+    @staticmethod
+    def _unlink_all(paths):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.log("WARN", f"StorageManager: could not delete {path}: {e}")
 
     # ------------------------------------------------------------
     # CLOUD SNAPSHOT
@@ -278,10 +496,27 @@ class StorageManager:
     def prepare_snapshot(self, modules: dict):
         path = os.path.join(self.TMP_DIR, f"snapshot_{int(time.time())}.json")
 
-        data = {name: m.read_status() for name, m in modules.items()}
-
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+        # Stream one module at a time so only a single status dict is
+        # resident, then swap the finished file into place.
+        tmp = tempfile.NamedTemporaryFile(dir=self.TMP_DIR, prefix=".snapshot_", delete=False)
+        try:
+            with tmp as f:
+                f.write(b"{\n")
+                for i, (name, m) in enumerate(modules.items()):
+                    f.write(b",\n  " if i else b"  ")
+                    f.write(json_codec.dumps(name))
+                    f.write(b": ")
+                    f.write(json_codec.dumps(m.read_status()))
+                f.write(b"\n}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp.name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp.name)
+            except FileNotFoundError:
+                pass
+            raise
 
         return path
 
@@ -292,10 +527,10 @@ class StorageManager:
     def cleanup_tmp(self, max_age_seconds=3600):
         now = time.time()
 
-        for f in os.listdir(self.TMP_DIR):
-            path = os.path.join(self.TMP_DIR, f)
-            if os.path.isfile(path) and now - os.path.getmtime(path) > max_age_seconds:
-                try:
-                    os.remove(path)
-                except:
-                    pass
+        with os.scandir(self.TMP_DIR) as it:
+            victims = [
+                entry.path for entry in it
+                if entry.is_file() and now - entry.stat().st_mtime > max_age_seconds
+            ]
+
+        self._unlink_all(victims)
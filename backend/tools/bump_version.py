@@ -10,6 +10,11 @@ import json
 import datetime
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 VERSION_FILE = "../version.json"
 CHANGELOG_FILE = "../changelog.txt"
 
@@ -18,8 +23,15 @@ def load_version():
         return json.load(f)
 
 def save_version(data):
-    with open(VERSION_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode()
+
+    tmp = VERSION_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, VERSION_FILE)
 
 def bump(version_type):
     v = load_version()
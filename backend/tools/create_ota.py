@@ -14,10 +14,13 @@ Output:
    ADA-Pi-v{VERSION}.ota
 """
 
+import io
 import os
 import json
+import shutil
 import tarfile
 import hashlib
+import subprocess
 from datetime import datetime
 
 
@@ -35,11 +38,20 @@ FROZEN_REQ = "backend/requirements-frozen.txt"
 # HELPERS
 # ------------------------------------------------------------
 def compute_sha256(path):
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for block in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(block)
-    return h.hexdigest()
+        # Python 3.11+: zero-copy read loop straight into OpenSSL
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        h = hashlib.sha256()
+        buf = bytearray(1024 * 1024)
+        mv = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(mv[:n])
+        return h.hexdigest()
 
 
 def load_version():
@@ -58,10 +70,60 @@ def load_changelog():
         return f.read()
 
 
+class _HashingReader:
+    """File proxy that feeds every byte read into a hash."""
+
+    def __init__(self, f, h):
+        self._f = f
+        self._h = h
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self._h.update(data)
+        return data
+
+
+class _HashingWriter:
+    """File proxy that feeds every byte written into a hash."""
+
+    def __init__(self, f, h):
+        self._f = f
+        self._h = h
+
+    def write(self, data):
+        self._h.update(data)
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
+
+
+def _add_hashed(tar, path, arcname, h):
+    """
+    tar.add() equivalent that hashes regular file contents as they are
+    streamed into the archive (directories walked in sorted order).
+    """
+    info = tar.gettarinfo(path, arcname=arcname)
+
+    if info.isreg():
+        with open(path, "rb") as f:
+            tar.addfile(info, _HashingReader(f, h))
+        return
+
+    tar.addfile(info)
+    if info.isdir():
+        for name in sorted(os.listdir(path)):
+            _add_hashed(tar, os.path.join(path, name), f"{arcname}/{name}", h)
+
+
 # ------------------------------------------------------------
 # MAIN
 # ------------------------------------------------------------
 def create_manifest(version, sha256):
+    """
+    Build manifest.json. sha256 covers the contents of the payload
+    files in archive order (the manifest itself is excluded).
+    """
     manifest = {
         "version": version,
         "timestamp": int(datetime.now().timestamp()),
@@ -76,8 +138,28 @@ def create_manifest(version, sha256):
         ]
     }
 
-    with open("manifest.json", "w") as f:
-        json.dump(manifest, f, indent=2)
+    return json.dumps(manifest, indent=2).encode()
+
+
+def write_payload(tar, version):
+    """
+    Add payload files and manifest.json to an open tar. Payload contents
+    are hashed as they stream in; the manifest goes in last.
+    """
+    content_sha = hashlib.sha256()
+
+    _add_hashed(tar, "backend", "backend", content_sha)
+    _add_hashed(tar, FROZEN_REQ, "requirements-frozen.txt", content_sha)
+
+    _add_hashed(tar, VERSION_FILE, "version.json", content_sha)
+    _add_hashed(tar, CHANGELOG_FILE, "changelog.txt", content_sha)
+
+    manifest = create_manifest(version, content_sha.hexdigest())
+    info = tarfile.TarInfo("manifest.json")
+    info.size = len(manifest)
+    info.mtime = int(datetime.now().timestamp())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(manifest))
 
 
 def build_ota():
@@ -88,28 +170,39 @@ def build_ota():
 
     print(f"Creating OTA: {output_file}")
 
-    # 1. Create tar.gz archive
-    with tarfile.open(output_file, "w:gz") as tar:
-        tar.add("backend", arcname="backend")
-        tar.add(FROZEN_REQ, arcname="requirements-frozen.txt")
-
-        tar.add(VERSION_FILE, arcname="version.json")
-        tar.add(CHANGELOG_FILE, arcname="changelog.txt")
-
-    # 2. Compute SHA256 and generate manifest.json
-    sha = compute_sha256(output_file)
-    create_manifest(version, sha)
-
-    # 3. Add manifest.json into the same directory
-    manifest_path = "manifest.json"
-    final_ota = f"{OUTPUT_DIR}/ADA-Pi-v{version}.ota"
-
-    # append manifest into final archive
-    with tarfile.open(final_ota, "a:gz") as tar:
-        tar.add(manifest_path, arcname="manifest.json")
+    pigz = shutil.which("pigz")
+
+    if pigz:
+        # Stream an uncompressed tar into pigz for multi-core gzip
+        with open(output_file, "wb") as raw:
+            proc = subprocess.Popen(
+                [pigz, "-c", "-p", str(os.cpu_count() or 1)],
+                stdin=subprocess.PIPE,
+                stdout=raw
+            )
+            try:
+                with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+                    write_payload(tar, version)
+            finally:
+                proc.stdin.close()
+                rc = proc.wait()
+
+        if rc != 0:
+            raise RuntimeError(f"pigz failed with exit code {rc}")
+
+        sha = compute_sha256(output_file)
+
+    else:
+        # Single-threaded gzip; hash the compressed output as it is written
+        archive_sha = hashlib.sha256()
+        with open(output_file, "wb") as raw:
+            with tarfile.open(fileobj=_HashingWriter(raw, archive_sha), mode="w:gz") as tar:
+                write_payload(tar, version)
+
+        sha = archive_sha.hexdigest()
 
     print("OTA created successfully.")
-    print(f"Path: {final_ota}")
+    print(f"Path: {output_file}")
     print(f"SHA256: {sha}")
 
 
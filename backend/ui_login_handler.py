@@ -1,7 +1,28 @@
-from typing import Any, Dict
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Tuple
 
+from auth_service import AuthService
 from login_bridge import login_with_ada_systems
 
+# Cache pentru login-uri reușite: (email, hash parolă, device_id) -> (expirare, sesiune, răspuns).
+# Reîncercările din UI cu aceleași credențiale nu mai fac încă un request HTTPS.
+# O intrare e validă doar cât timp AuthService ține exact sesiunea creată de acel login;
+# orice alt login reușit sau logout golește tot cache-ul.
+LOGIN_CACHE_MAX_TTL = 300  # secunde
+
+_login_cache: Dict[Tuple[str, bytes, str], Tuple[float, Any, Dict[str, Any]]] = {}
+_login_cache_lock = threading.Lock()
+
+
+def clear_login_cache() -> None:
+    """
+    Golește cache-ul de login (apelat și din AuthService.logout()).
+    """
+    with _login_cache_lock:
+        _login_cache.clear()
+
 
 def handle_ui_login(email: str, password: str, device_id: str = "ada-pi-001") -> Dict[str, Any]:
     """
@@ -25,6 +46,18 @@ def handle_ui_login(email: str, password: str, device_id: str = "ada-pi-001") ->
       }
     """
 
+    key = (email, hashlib.blake2b(password.encode(), digest_size=16).digest(), device_id)
+
+    # servim din cache doar dacă sesiunea activă e chiar cea a acestui login
+    # (același email + device); altfel login-ul se face din nou
+    with _login_cache_lock:
+        cached = _login_cache.get(key)
+        if cached is not None:
+            expires, session, response = cached
+            if time.monotonic() < expires and AuthService.instance().session is session:
+                return response
+            del _login_cache[key]
+
     result = login_with_ada_systems(email=email, password=password, device_id=device_id)
 
     if not result.get("ok"):
@@ -34,6 +67,9 @@ def handle_ui_login(email: str, password: str, device_id: str = "ada-pi-001") ->
             "error": result.get("error", "Autentificare eșuată"),
         }
 
+    # login reușit = sesiune nouă: intrările vechi (alt user / alt device) nu mai sunt valide
+    clear_login_cache()
+
     # dacă nu are acces la dashboard, întoarcem un mesaj clar pentru UI
     if not result["can_access_dashboard"]:
         return {
@@ -42,7 +78,7 @@ def handle_ui_login(email: str, password: str, device_id: str = "ada-pi-001") ->
         }
 
     # totul ok: user + permisiuni + feature flags
-    return {
+    response = {
         "ok": True,
         "user": result["user"],
         "can_access_dashboard": result["can_access_dashboard"],
@@ -52,3 +88,11 @@ def handle_ui_login(email: str, password: str, device_id: str = "ada-pi-001") ->
         "token_type": result["token_type"],
         "expires_in": result["expires_in"],
     }
+
+    # cache doar pentru succes, cât timp token-ul e încă valid (max 5 min)
+    ttl = min((result["expires_in"] or 0) * 0.8, LOGIN_CACHE_MAX_TTL)
+    if ttl > 0:
+        with _login_cache_lock:
+            _login_cache[key] = (time.monotonic() + ttl, AuthService.instance().session, response)
+
+    return response
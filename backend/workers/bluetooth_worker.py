@@ -3,6 +3,7 @@
 # Uses BlueZ over DBus for scanning, pairing, connecting, and status updates
 
 import time
+import queue
 from logger import logger
 from ipc.router import router
 from engine.bluetooth_dbus import BluetoothDBus
@@ -10,19 +11,20 @@ from engine.bluetooth_dbus import BluetoothDBus
 
 class BluetoothWorker:
     INTERVAL = 5  # seconds between scans
+    HEARTBEAT = 60  # re-publish unchanged bt_update at least this often
 
     def __init__(self, bt_module):
         self.bt = bt_module
         self.running = True
         self.dbus = BluetoothDBus()
 
-        # Commands triggered by REST API
-        self.cmd_pair = None
-        self.cmd_remove = None
-        self.cmd_connect = None
-        self.cmd_disconnect = None
-        self.cmd_set_power = None       # True/False
-        self.cmd_set_discoverable = None
+        # Commands triggered by REST API / cloud: (op, arg) tuples.
+        # The worker blocks on this queue, so commands run immediately.
+        self._cmd_q = queue.SimpleQueue()
+
+        # signature + time of the last published bt_update
+        self._last_bt_sig = None
+        self._last_bt_publish = 0.0
 
         # Listen for config changes from cloud
         router.subscribe("bluetooth_config_changed", self._on_config_changed)
@@ -32,77 +34,94 @@ class BluetoothWorker:
         logger.log("INFO", f"BluetoothWorker: config changed from cloud: {config}")
         
         if "enabled" in config:
-            self.cmd_set_power = config["enabled"]
+            self.set_power(config["enabled"])
         
         if "discoverable" in config:
-            self.cmd_set_discoverable = config["discoverable"]
+            self.set_discoverable(config["discoverable"])
+
+    # ------------------------------------------------------------
+    # COMMAND API
+    # ------------------------------------------------------------
+    def set_power(self, state):
+        self._cmd_q.put(("set_power", state))
+
+    def set_discoverable(self, state):
+        self._cmd_q.put(("set_discoverable", state))
+
+    def pair(self, mac):
+        self._cmd_q.put(("pair", mac))
+
+    def remove(self, mac):
+        self._cmd_q.put(("remove", mac))
+
+    def connect(self, mac):
+        self._cmd_q.put(("connect", mac))
+
+    def disconnect(self, mac):
+        self._cmd_q.put(("disconnect", mac))
 
     # ------------------------------------------------------------
     def start(self):
         logger.log("INFO", "BluetoothWorker started.")
 
+        deadline = time.monotonic()
+
         while self.running:
             try:
-                self._process_commands()
-                self._update_status()
-                self._refresh_devices()
+                timeout = max(0, deadline - time.monotonic())
+                try:
+                    op, arg = self._cmd_q.get(timeout=timeout)
+                except queue.Empty:
+                    self._update_status()
+                    self._refresh_devices()
+                    deadline = time.monotonic() + self.INTERVAL
+                else:
+                    self._dispatch(op, arg)
             except Exception as e:
                 logger.log("ERROR", f"BluetoothWorker error: {e}")
-
-            time.sleep(self.INTERVAL)
+                deadline = time.monotonic() + self.INTERVAL
 
     # ------------------------------------------------------------
     def stop(self):
         self.running = False
+        # wake the blocked get() so the loop sees running=False
+        self._cmd_q.put(("noop", None))
 
     # ------------------------------------------------------------
     # EXECUTE COMMANDS FROM API
     # ------------------------------------------------------------
-    def _process_commands(self):
-
-        # Power toggle
-        if self.cmd_set_power is not None:
-            state = bool(self.cmd_set_power)
-            success = self.dbus.set_power(state)
-            logger.log("INFO", f"BT Power -> {state}")
-            self.bt.powered = state
-            self.cmd_set_power = None
-
-        # Discoverable toggle
-        if self.cmd_set_discoverable is not None:
-            state = bool(self.cmd_set_discoverable)
-            success = self.dbus.set_discoverable(state)
-            logger.log("INFO", f"BT Discoverable -> {state}")
-            self.bt.discoverable = state
-            self.cmd_set_discoverable = None
-
-        # Pair device
-        if self.cmd_pair:
-            mac = self.cmd_pair
-            logger.log("INFO", f"Pairing with {mac}")
-            ok = self.dbus.pair(mac)
-            self.cmd_pair = None
-
-        # Remove paired device
-        if self.cmd_remove:
-            mac = self.cmd_remove
-            logger.log("INFO", f"Removing {mac}")
-            ok = self.dbus.remove(mac)
-            self.cmd_remove = None
-
-        # Connect
-        if self.cmd_connect:
-            mac = self.cmd_connect
-            logger.log("INFO", f"Connecting to {mac}")
-            ok = self.dbus.connect(mac)
-            self.cmd_connect = None
-
-        # Disconnect
-        if self.cmd_disconnect:
-            mac = self.cmd_disconnect
-            logger.log("INFO", f"Disconnecting {mac}")
-            ok = self.dbus.disconnect(mac)
-            self.cmd_disconnect = None
+    def _dispatch(self, op, arg):
+        handler = getattr(self, f"_do_{op}", None)
+        if handler is not None:
+            handler(arg)
+
+    def _do_set_power(self, state):
+        state = bool(state)
+        self.dbus.set_power(state)
+        logger.log("INFO", f"BT Power -> {state}")
+        self.bt.powered = state
+
+    def _do_set_discoverable(self, state):
+        state = bool(state)
+        self.dbus.set_discoverable(state)
+        logger.log("INFO", f"BT Discoverable -> {state}")
+        self.bt.discoverable = state
+
+    def _do_pair(self, mac):
+        logger.log("INFO", f"Pairing with {mac}")
+        self.dbus.pair(mac)
+
+    def _do_remove(self, mac):
+        logger.log("INFO", f"Removing {mac}")
+        self.dbus.remove(mac)
+
+    def _do_connect(self, mac):
+        logger.log("INFO", f"Connecting to {mac}")
+        self.dbus.connect(mac)
+
+    def _do_disconnect(self, mac):
+        logger.log("INFO", f"Disconnecting {mac}")
+        self.dbus.disconnect(mac)
 
     # ------------------------------------------------------------
     # UPDATE ADAPTER STATUS
@@ -142,7 +161,19 @@ class BluetoothWorker:
         self.bt.paired_devices = paired
         self.bt.available_devices = available
 
-        # Send event to UI
+        # Send event to UI only when something changed (or heartbeat due)
+        sig = hash((
+            self.bt.powered,
+            self.bt.discoverable,
+            tuple((d["mac"], d["name"], d["connected"], d["rssi"]) for d in paired),
+            tuple((d["mac"], d["name"], d["rssi"]) for d in available),
+        ))
+        now = time.monotonic()
+        if sig == self._last_bt_sig and now - self._last_bt_publish < self.HEARTBEAT:
+            return
+        self._last_bt_sig = sig
+        self._last_bt_publish = now
+
         router.publish("bt_update", {
             "powered": self.bt.powered,
             "discoverable": self.bt.discoverable,
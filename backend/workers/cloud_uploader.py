@@ -1,7 +1,13 @@
 import time
 import json
+import gzip
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import json_codec
 from logger import logger
 from ipc.router import router
 from config_manager import load_config
@@ -9,6 +15,113 @@ from engine.jwt_auth import create_jwt
 from settings_handler import settings_handler
 
 
+class CircuitBreaker:
+    """
+    Fast-fails calls to an endpoint after repeated failures.
+
+    Opens after `failure_threshold` consecutive failures; once
+    `reset_timeout` seconds have passed a single trial call is let
+    through (half-open) and its result closes or re-opens the breaker.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.log("INFO", f"CloudUploader: {self.name} endpoint recovered")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.log("WARN", f"CloudUploader: {self.name} endpoint failing, pausing for {self.reset_timeout}s")
+            self.opened_at = time.monotonic()
+
+
+class _MultipartBody:
+    """
+    multipart/form-data body read straight from disk, so log files are
+    streamed with a Content-Length instead of being assembled in memory.
+    """
+
+    def __init__(self, fields=(), files=()):
+        self.boundary = os.urandom(16).hex()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []
+        self._handles = []
+
+        try:
+            for name, value in fields:
+                self._parts.append(
+                    f'--{self.boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                    f'{value}\r\n'.encode()
+                )
+
+            for name, filename, path in files:
+                f = open(path, "rb")
+                self._handles.append(f)
+                # size pinned at open time; a log still being appended to is cut here
+                size = os.fstat(f.fileno()).st_size
+                self._parts.append(
+                    f'--{self.boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: application/octet-stream\r\n\r\n'.encode()
+                )
+                self._parts.append((f, size))
+                self._parts.append(b"\r\n")
+        except Exception:
+            self.close()
+            raise
+
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+        self._len = sum(p[1] if isinstance(p, tuple) else len(p) for p in self._parts)
+        self._parts.reverse()
+
+    def __len__(self):
+        return self._len
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._len
+
+        out = []
+        parts = self._parts
+        while size > 0 and parts:
+            part = parts.pop()
+            if isinstance(part, tuple):
+                f, left = part
+                chunk = f.read(min(size, left))
+                if not chunk:
+                    raise IOError(f"{f.name} shrank during upload")
+                if left > len(chunk):
+                    parts.append((f, left - len(chunk)))
+            else:
+                chunk = part[:size]
+                if len(part) > size:
+                    parts.append(part[size:])
+            out.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(out)
+
+    def close(self):
+        for f in self._handles:
+            f.close()
+
+
 class CloudUploader:
     """
     Cloud uploader with CONFIG CACHING.
@@ -21,18 +134,65 @@ class CloudUploader:
     INTERVAL = 15
     LOG_UPLOAD_INTERVAL = 300
     RETRIES = 3
+    LOG_BATCH_BYTES = 20 * 1024 * 1024  # max payload per batched log POST
+    BACKOFF_BASE = 1.5      # seconds, doubled per attempt
+    BACKOFF_MAX = 30        # seconds
+    BACKOFF_JITTER = 0.5    # seconds of random spread
 
-    def __init__(self, modules, storage):
+    SNAPSHOT_MODULES = (
+        "gps", "obd", "tacho", "modem", "network",
+        "ups", "fan", "bluetooth", "system",
+    )
+    SNAPSHOT_TIMEOUT = 2    # seconds to wait for module statuses
+
+    JWT_MINUTES = 15        # token lifetime
+    JWT_MARGIN = 60         # re-sign this many seconds before expiry
+
+    STOP_TIMEOUT = 5        # seconds stop() waits for the loop to finish its cycle
+
+    def __init__(self, modules, storage, shutdown=None):
         self.modules = modules
         self.storage = storage
-        self.running = True
+        # Shared with the other workers when main passes one in
+        self._shutdown = shutdown or threading.Event()
         self.last_log_upload = 0
+        self._batch_logs_supported = True
+        self._gzip_snapshot = True
+
+        # Snapshot retry state, driven by the start() loop
+        self._snapshot_attempt = 0
+        self._snapshot_retry_at = None
+
+        # Signed token reused until shortly before it expires
+        self._jwt, self._jwt_exp = None, 0
+
+        # Per-endpoint breakers so a dead cloud doesn't cost RETRIES waits every cycle
+        self._snapshot_breaker = CircuitBreaker("snapshot")
+        self._logs_breaker = CircuitBreaker("logs")
+
+        # One pooled keep-alive session for snapshot + log uploads
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        # Module statuses are gathered in parallel; slow ones fall back to the last value
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self.SNAPSHOT_MODULES), thread_name_prefix="snap"
+        )
+        self._last_snapshot = {}
+
+        # Set to cut the inter-upload wait short (config change, stop, trigger)
+        self._wake = threading.Event()
+        # Set by start() after the loop has exited and the pool/session are closed
+        self._stopped = threading.Event()
 
         # Cached config values
         self._load_config_cached()
 
         # Listen for config changes (e.g. settings updated)
         router.subscribe("config_changed", self._reload_config)
+        router.subscribe("trigger_upload", self._trigger_upload)
 
     # ------------------------------------------------------------
     # CONFIG CACHE
@@ -56,13 +216,22 @@ class CloudUploader:
         """Reload config when frontend/API updates it."""
         logger.log("INFO", "CloudUploader: configuration reload triggered")
         self._load_config_cached()
+        self._jwt, self._jwt_exp = None, 0   # device_id may have changed
+        self._wake.set()
+
+    def _trigger_upload(self, _=None):
+        """Upload a snapshot now instead of waiting for the next interval."""
+        self._wake.set()
 
     # ------------------------------------------------------------
     def start(self):
         logger.log("INFO", "CloudUploader started.")
 
-        while self.running:
+        while not self._shutdown.is_set():
             now = time.time()
+            # Cleared before the work, not after the wait: a trigger that lands
+            # while this cycle runs keeps the flag set and cuts the next wait short
+            self._wake.clear()
 
             try:
                 self.upload_snapshot()
@@ -71,29 +240,44 @@ class CloudUploader:
                     self.upload_logs()
                     self.last_log_upload = now
 
-                time.sleep(self.INTERVAL)
+                self._wake.wait(self._next_wait())
 
             except Exception as e:
                 logger.log("ERROR", f"CloudUploader crash: {e}")
-                time.sleep(5)
+                self._wake.wait(5)
+
+        # Torn down only once the loop is out, so no submit/post hits a closed pool or session
+        self._pool.shutdown(wait=False)
+        self._session.close()
+        self._stopped.set()
 
     # ------------------------------------------------------------
     def stop(self):
-        self.running = False
+        self._shutdown.set()
+        self._wake.set()
+        self._stopped.wait(self.STOP_TIMEOUT)
 
     # ------------------------------------------------------------
     # SNAPSHOT UPLOAD
     # ------------------------------------------------------------
 
     def upload_snapshot(self):
+        # One attempt per call; a failed attempt schedules the next one via
+        # _snapshot_retry_at and the start() loop's wait instead of sleeping here
+        self._snapshot_retry_at = None
+
         if not self.cloud_url:
             return
 
+        if not self._snapshot_breaker.allow():
+            self._snapshot_attempt = 0
+            return
+
         if not self._online():
             logger.log("WARN", "CloudUploader: offline, skipping snapshot")
             return
 
-        snapshot = self._build_snapshot()
+        raw = json_codec.dumps(self._build_snapshot())
         token = self._get_jwt()
 
         headers = {
@@ -101,36 +285,83 @@ class CloudUploader:
             "Content-Type": "application/json"
         }
 
-        for attempt in range(self.RETRIES):
-            try:
-                resp = requests.post(
+        # Snapshot JSON compresses several times over; saves modem airtime
+        if self._gzip_snapshot:
+            body = gzip.compress(raw, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = raw
+
+        attempt = self._snapshot_attempt
+        try:
+            resp = self._session.post(
+                self.cloud_url,
+                headers=headers,
+                data=body,
+                timeout=10
+            )
+
+            # server can't read gzip bodies: resend this same snapshot as plain JSON
+            if "Content-Encoding" in headers and self._gzip_rejected(resp):
+                logger.log("WARN", "CloudUploader: server rejected gzip snapshot, sending plain JSON")
+                self._gzip_snapshot = False
+                del headers["Content-Encoding"]
+                resp = self._session.post(
                     self.cloud_url,
                     headers=headers,
-                    json=snapshot,
+                    data=raw,
                     timeout=10
                 )
 
-                # accept all 2xx codes
-                if 200 <= resp.status_code < 300:
-                    router.publish("cloud_upload", {"status": "ok"})
-                    
-                    # Process server response
-                    self._process_server_response(resp)
-                    return
+            # accept all 2xx codes
+            if 200 <= resp.status_code < 300:
+                self._snapshot_attempt = 0
+                self._snapshot_breaker.record_success()
+                router.publish("cloud_upload", {"status": "ok"})
+                
+                # Process server response
+                self._process_server_response(resp)
+                return
 
-                logger.log(
-                    "WARN",
-                    f"Snapshot upload failed (try {attempt+1}/{self.RETRIES}): "
-                    f"HTTP {resp.status_code}"
-                )
+            logger.log(
+                "WARN",
+                f"Snapshot upload failed (try {attempt+1}/{self.RETRIES}): "
+                f"HTTP {resp.status_code}"
+            )
 
-            except Exception as e:
-                logger.log(
-                    "ERROR",
-                    f"Snapshot upload error (try {attempt+1}/{self.RETRIES}): {e}"
-                )
+            # client errors won't fix themselves on retry
+            if not self._retryable(resp.status_code):
+                self._snapshot_attempt = 0
+                return
 
-            time.sleep(2)
+        except Exception as e:
+            logger.log(
+                "ERROR",
+                f"Snapshot upload error (try {attempt+1}/{self.RETRIES}): {e}"
+            )
+
+        if attempt + 1 < self.RETRIES:
+            self._snapshot_attempt = attempt + 1
+            self._snapshot_retry_at = time.monotonic() + self._backoff_delay(attempt)
+        else:
+            self._snapshot_attempt = 0
+            self._snapshot_breaker.record_failure()
+
+    @staticmethod
+    def _gzip_rejected(resp):
+        """True for a 415, or a 400 whose body blames the content encoding."""
+        if resp.status_code == 415:
+            return True
+        if resp.status_code != 400:
+            return False
+        text = resp.text[:512].lower()
+        return "encoding" in text or "gzip" in text
+
+    def _next_wait(self):
+        """Seconds until the next cycle: the interval, or sooner if a snapshot retry is due."""
+        if self._snapshot_retry_at is None:
+            return self.INTERVAL
+        return max(0, min(self.INTERVAL, self._snapshot_retry_at - time.monotonic()))
 
     # ------------------------------------------------------------
     # PROCESS SERVER RESPONSE
@@ -188,6 +419,9 @@ class CloudUploader:
             logger.log("WARN", "CloudUploader: no logs_url configured")
             return
 
+        if not self._logs_breaker.allow():
+            return
+
         if not self._online():
             logger.log("WARN", "CloudUploader: offline, skipping log upload")
             return
@@ -202,77 +436,209 @@ class CloudUploader:
             ("yearly",  self.storage.get_yearly_logs()),
         ]
 
+        # One bulk fetch per category instead of a lookup per file
+        uploaded = {category: self.storage.get_uploaded_set(category) for category, _ in categories}
+
         for category, files in categories:
+            done = uploaded[category]
+            pending = []
+
             for entry in files:
 
                 filename = os.path.basename(entry)
 
                 # skip already uploaded
-                if self.storage.is_uploaded(category, filename):
+                if filename in done:
                     continue
 
-                # Determine full path
-                if os.path.exists(entry):
-                    path = entry
-                else:
-                    path = os.path.join(self.storage.tacho_dir, category, filename)
+                path = os.path.join(self.storage.TACHO_DIR, filename)
 
-                if not os.path.exists(path):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
                     logger.log("WARN", f"Log missing: {path}")
                     continue
 
-                # Upload with retries
-                for attempt in range(self.RETRIES):
+                pending.append((filename, path, size))
+
+            for batch in self._log_batches(pending):
+                if self._shutdown.is_set() or not self._logs_breaker.allow():
+                    return
+
+                if len(batch) > 1 and self._batch_logs_supported:
+                    batch = self._upload_log_batch(category, batch, headers)
+
+                for filename, path, _ in batch:
+                    if self._shutdown.is_set() or not self._logs_breaker.allow():
+                        return
+                    self._upload_log_file(category, filename, path, headers)
+
+    def _log_batches(self, pending):
+        """Split (filename, path, size) entries into batches of at most LOG_BATCH_BYTES."""
+        batch, batch_bytes = [], 0
+
+        for item in pending:
+            if batch and batch_bytes + item[2] > self.LOG_BATCH_BYTES:
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(item)
+            batch_bytes += item[2]
+
+        if batch:
+            yield batch
+
+    def _upload_log_batch(self, category, batch, headers):
+        """
+        Upload several log files in one multipart POST (file, file[1], file[2], ...).
+        The server answers {"uploaded": [filename, ...]}; those are marked.
+        The first part keeps the single-file field name, so a server without
+        batch support still stores that one file and answers a plain 2xx.
+        Returns the entries still to be uploaded file by file.
+        """
+        names = ", ".join(filename for filename, _, _ in batch)
+
+        for attempt in range(self.RETRIES):
+            body = None
+            try:
+                body = _MultipartBody(
+                    fields=[("category", category)],
+                    files=[(f"file[{i}]" if i else "file", filename, path) for i, (filename, path, _) in enumerate(batch)],
+                )
+
+                resp = self._session.post(
+                    self.logs_url,
+                    headers={**headers, "Content-Type": body.content_type},
+                    data=body,
+                    timeout=60
+                )
+
+                if 200 <= resp.status_code < 300:
                     try:
-                        with open(path, "rb") as f:
-                            resp = requests.post(
-                                self.logs_url,
-                                headers=headers,
-                                files={"file": (filename, f)},
-                                timeout=20
-                            )
-
-                        # Accept all 2xx codes
-                        if 200 <= resp.status_code < 300:
-                            logger.log("INFO", f"Uploaded {category} log: {filename}")
-                            self.storage.mark_uploaded(category, filename)
-                            break
-
-                        logger.log(
-                            "WARN",
-                            f"Upload failed for {filename} (try {attempt+1}/{self.RETRIES}): "
-                            f"HTTP {resp.status_code}"
-                        )
-
-                    except Exception as e:
-                        logger.log(
-                            "ERROR",
-                            f"Upload error for {filename} (try {attempt+1}/{self.RETRIES}): {e}"
-                        )
-
-                    time.sleep(2)
+                        uploaded = resp.json().get("uploaded")
+                    except ValueError:
+                        uploaded = None
+
+                    self._logs_breaker.record_success()
+
+                    if not isinstance(uploaded, list):
+                        # server took only the "file" part: mark it, send the rest singly
+                        logger.log("WARN", "CloudUploader: server does not support batched log upload")
+                        self._batch_logs_supported = False
+                        filename = batch[0][0]
+                        logger.log("INFO", f"Uploaded {category} log: {filename}")
+                        self.storage.mark_uploaded(category, filename)
+                        return batch[1:]
+
+                    sent = {filename for filename, _, _ in batch}
+                    for filename in uploaded:
+                        if filename not in sent:
+                            continue
+                        logger.log("INFO", f"Uploaded {category} log: {filename}")
+                        self.storage.mark_uploaded(category, filename)
+                    return []
+
+                if resp.status_code == 413:
+                    logger.log("WARN", f"Batch of {len(batch)} {category} logs too large, uploading one by one")
+                    return batch
+
+                logger.log(
+                    "WARN",
+                    f"Batch upload failed for {names} (try {attempt+1}/{self.RETRIES}): "
+                    f"HTTP {resp.status_code}"
+                )
+
+                if not self._retryable(resp.status_code):
+                    return []
+
+            except Exception as e:
+                logger.log(
+                    "ERROR",
+                    f"Batch upload error for {names} (try {attempt+1}/{self.RETRIES}): {e}"
+                )
+
+            finally:
+                if body is not None:
+                    body.close()
+
+            if attempt < self.RETRIES - 1:
+                self._backoff(attempt)
+
+        self._logs_breaker.record_failure()
+        return []
+
+    def _upload_log_file(self, category, filename, path, headers):
+        """Upload a single log file with retries."""
+        for attempt in range(self.RETRIES):
+            body = None
+            try:
+                body = _MultipartBody(files=[("file", filename, path)])
+                resp = self._session.post(
+                    self.logs_url,
+                    headers={**headers, "Content-Type": body.content_type},
+                    data=body,
+                    timeout=20
+                )
+
+                # Accept all 2xx codes
+                if 200 <= resp.status_code < 300:
+                    self._logs_breaker.record_success()
+                    logger.log("INFO", f"Uploaded {category} log: {filename}")
+                    self.storage.mark_uploaded(category, filename)
+                    return True
+
+                logger.log(
+                    "WARN",
+                    f"Upload failed for {filename} (try {attempt+1}/{self.RETRIES}): "
+                    f"HTTP {resp.status_code}"
+                )
+
+                if not self._retryable(resp.status_code):
+                    return False
+
+            except Exception as e:
+                logger.log(
+                    "ERROR",
+                    f"Upload error for {filename} (try {attempt+1}/{self.RETRIES}): {e}"
+                )
+
+            finally:
+                if body is not None:
+                    body.close()
+
+            if attempt < self.RETRIES - 1:
+                self._backoff(attempt)
+
+        self._logs_breaker.record_failure()
+        return False
 
     # ------------------------------------------------------------
     # SNAPSHOT BUILDER
     # ------------------------------------------------------------
 
     def _build_snapshot(self):
-        return {
+        snapshot = {
             "timestamp": int(time.time()),
             "device_id": self.device_id,
             "pi_type": self.pi_type,
-            "gps": self.modules["gps"].read_status(),
-            "obd": self.modules["obd"].read_status(),
-            "tacho": self.modules["tacho"].read_status(),
-            "modem": self.modules["modem"].read_status(),
-            "network": self.modules["network"].read_status(),
-            "ups": self.modules["ups"].read_status(),
-            "fan": self.modules["fan"].read_status(),
-            "bluetooth": self.modules["bluetooth"].read_status(),
-            "system": self.modules["system"].read_status(),
-            "config": self._get_config_snapshot()
         }
 
+        futures = {
+            name: self._pool.submit(self.modules[name].read_status)
+            for name in self.SNAPSHOT_MODULES
+        }
+        wait(futures.values(), timeout=self.SNAPSHOT_TIMEOUT)
+
+        last = self._last_snapshot
+        for name, fut in futures.items():
+            if fut.done() and fut.exception() is None:
+                last[name] = fut.result()
+            else:
+                logger.log("WARN", f"CloudUploader: {name} status unavailable, reusing last value")
+            snapshot[name] = last.get(name, {})
+
+        snapshot["config"] = self._get_config_snapshot()
+        return snapshot
+
     # ------------------------------------------------------------
     # HELPERS
     # ------------------------------------------------------------
@@ -336,9 +702,28 @@ class CloudUploader:
         }
 
 
+    @staticmethod
+    def _retryable(status_code):
+        """Server errors and throttling are worth retrying; other 4xx are not."""
+        return status_code >= 500 or status_code == 429
+
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with jitter between retry attempts."""
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt))
+        return delay + random.random() * self.BACKOFF_JITTER
+
+    def _backoff(self, attempt):
+        self._shutdown.wait(self._backoff_delay(attempt))
+
     def _get_jwt(self):
+        now = time.time()
+        if self._jwt and now < self._jwt_exp - self.JWT_MARGIN:
+            return self._jwt
+
         payload = {"device": self.device_id}
-        return create_jwt(payload, expire_minutes=15)
+        self._jwt = create_jwt(payload, expire_minutes=self.JWT_MINUTES)
+        self._jwt_exp = now + self.JWT_MINUTES * 60
+        return self._jwt
 
     def _online(self):
         """Check if we have internet via WiFi, Ethernet, or Modem."""
@@ -6,9 +6,8 @@
 #   ✓ Auto mode with temperature curve
 #   ✓ Manual override mode
 
-import time
 import os
-import subprocess
+import threading
 from logger import logger
 from ipc.router import router
 
@@ -16,9 +15,9 @@ from ipc.router import router
 class FanWorker:
     INTERVAL = 2  # seconds
 
-    def __init__(self, fan_module):
+    def __init__(self, fan_module, shutdown=None):
         self.fan = fan_module
-        self.running = True
+        self._shutdown = shutdown or threading.Event()
         self.current_temp = 0.0
 
         # temperature source used by Raspberry Pi 5
@@ -29,7 +28,17 @@ class FanWorker:
         self.hw_fan_max_file = "/sys/devices/platform/cooling_fan/hwmon/hwmon0/pwm1_max"
 
         self.has_hw_fan = os.path.exists(self.hw_fan_speed_file)
+
+        # pwm1_max is fixed for the device, read it once
+        self._max_pwm = None
+        self._pwm_table = {}
+        if self.has_hw_fan:
+            self._load_max_pwm()
         
+        # Last percent written, so steady bands don't rewrite sysfs every cycle
+        self._last_applied_pct = None
+        self._last_mode = None
+
         # Track whether hardware fan is available in the module state
         self.fan.update(supports_hw=self.has_hw_fan)
 
@@ -39,7 +48,7 @@ class FanWorker:
     def start(self):
         logger.log("INFO", "FanWorker started.")
 
-        while self.running:
+        while not self._shutdown.is_set():
             try:
                 # Read temperature and update module state
                 self.current_temp = self._read_temp()
@@ -47,8 +56,14 @@ class FanWorker:
 
                 # Get fan mode
                 status = self.fan.read_status()
+                mode = status.get("mode")
+
+                # Re-apply after a manual <-> auto switch even if the percent matches
+                if mode != self._last_mode:
+                    self._last_mode = mode
+                    self._last_applied_pct = None
                 
-                if status.get("mode") == "auto":
+                if mode == "auto":
                     speed = self.fan.auto_control()
                 else:  # manual mode
                     speed = status.get("speed", 0)
@@ -61,15 +76,15 @@ class FanWorker:
                     "temperature": self.current_temp
                 })
 
-                time.sleep(self.INTERVAL)
+                self._shutdown.wait(self.INTERVAL)
 
             except Exception as e:
                 logger.log("ERROR", f"FanWorker crash: {e}")
-                time.sleep(2)
+                self._shutdown.wait(2)
 
     # ------------------------------------------------------------
     def stop(self):
-        self.running = False
+        self._shutdown.set()
 
     # ------------------------------------------------------------
     # TEMPERATURE READ
@@ -82,54 +97,58 @@ class FanWorker:
         except:
             return 0.0
 
-    # ------------------------------------------------------------
-    # AUTO FAN CURVE
-    # ------------------------------------------------------------
-    def _auto_speed(self, temp):
-        """
-        Default curve:
-            <40°C → 0%
-            40–50°C → 25%
-            50–60°C → 50%
-            60–70°C → 75%
-            >70°C → 100%
-        """
-        if temp < 40:
-            return 0
-        if temp < 50:
-            return 25
-        if temp < 60:
-            return 50
-        if temp < 70:
-            return 75
-        return 100
-
     # ------------------------------------------------------------
     # APPLY FAN SPEED (hardware OR pwm)
     # ------------------------------------------------------------
     def _apply_speed(self, percent):
         """
         Writing speed to hardware fan or fallback PWM.
+        Skipped when the percent is unchanged since the last successful write.
         """
+        if percent == self._last_applied_pct:
+            return
+
         if self.has_hw_fan:
-            self._apply_hw_fan(percent)
+            ok = self._apply_hw_fan(percent)
         else:
-            self._apply_pwm_fan(percent)
+            ok = self._apply_pwm_fan(percent)
+
+        if ok:
+            self._last_applied_pct = percent
 
     # ------------------------------------------------------------
-    def _apply_hw_fan(self, percent):
+    def _load_max_pwm(self):
         try:
-            # Read max PWM value
             with open(self.hw_fan_max_file) as f:
-                max_pwm = int(f.read().strip())
+                self._max_pwm = int(f.read().strip())
+        except Exception as e:
+            logger.log("ERROR", f"Failed reading hw fan max: {e}")
+            return
+
+        # FanModule.auto_control only produces these steps
+        self._pwm_table = {
+            pct: int(self._max_pwm * (pct / 100)) for pct in (0, 25, 50, 75, 100)
+        }
+
+    # ------------------------------------------------------------
+    def _apply_hw_fan(self, percent):
+        try:
+            if self._max_pwm is None:
+                self._load_max_pwm()
+                if self._max_pwm is None:
+                    return False
 
-            pwm_value = int(max_pwm * (percent / 100))
+            pwm_value = self._pwm_table.get(percent)
+            if pwm_value is None:
+                pwm_value = int(self._max_pwm * (percent / 100))
 
             with open(self.hw_fan_speed_file, "w") as f:
                 f.write(str(pwm_value))
+            return True
 
         except Exception as e:
             logger.log("ERROR", f"Failed writing hw fan speed: {e}")
+            return False
 
     # ------------------------------------------------------------
     def _apply_pwm_fan(self, percent):
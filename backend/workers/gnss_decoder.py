@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# GNSS helpers shared by GPSWorker and ModemWorker
+# Decodes +CGPSINFO / +CGNSSINFO payloads returned by the AT engine.
+# Everything works on bytes (ATCommandEngine.send(..., raw=True)) so fixes
+# are parsed without a decode/encode round-trip; int()/float() take bytes.
+
+import time
+from datetime import datetime, timezone
+
+GPS_MIN_DEG = 1e-5      # ~1 m; smaller moves don't re-publish gps_update
+GPS_MIN_SPEED = 0.5     # km/h
+GPS_HEARTBEAT = 30      # re-publish an unchanged fix at least this often
+
+
+def info_payload(resp, prefix):
+    """Return the stripped bytes after `prefix` on the first matching line."""
+    for line in resp:
+        line = line.lstrip()
+        if line.startswith(prefix):
+            return line[len(prefix):].strip()
+    return None
+
+
+def coord(deg, minutes, hemi):
+    """ddmm.mmmm split into degrees/minutes + hemisphere -> signed decimal degrees."""
+    dec = int(deg) + float(minutes) / 60.0
+    return -dec if hemi in b"SW" else dec
+
+
+def fix_timestamp(date_str, time_str):
+    """ddmmyy + hhmmss[.s] -> UTC ISO string, sliced directly instead of strptime."""
+    if not date_str or len(date_str) != 6 or not time_str:
+        return None
+    t = time_str.partition(b".")[0].ljust(6, b"0")
+    try:
+        return datetime(
+            2000 + int(date_str[4:6]), int(date_str[2:4]), int(date_str[0:2]),
+            int(t[0:2]), int(t[2:4]), int(t[4:6]), tzinfo=timezone.utc
+        ).isoformat()
+    except ValueError:
+        return None
+
+
+class GpsPublishFilter:
+    """Drops gps_update frames that repeat the last published fix."""
+
+    def __init__(self):
+        self.last = None
+        self.last_time = 0
+
+    def moved(self, lat, lon, speed, state=None):
+        """
+        True if a fix differs enough from the last published one (or the heartbeat is due).
+        `state` holds discrete fields (satellites, unit) that force a publish on any change.
+        """
+        now = time.monotonic()
+        last = self.last
+        if (last is not None
+                and abs(lat - last[0]) <= GPS_MIN_DEG
+                and abs(lon - last[1]) <= GPS_MIN_DEG
+                and abs(speed - last[2]) <= GPS_MIN_SPEED
+                and state == last[3]
+                and now - self.last_time < GPS_HEARTBEAT):
+            return False
+        self.last = (lat, lon, speed, state)
+        self.last_time = now
+        return True
+
+    def no_fix_due(self, had_fix):
+        """True if a no-fix frame should go out: the fix was just lost or the heartbeat is due."""
+        now = time.monotonic()
+        if not had_fix and now - self.last_time < GPS_HEARTBEAT:
+            return False
+        self.last = None
+        self.last_time = now
+        return True
@@ -1,53 +1,100 @@
-import time
 import re
+import math
+import threading
 from datetime import datetime, timezone
 from logger import logger
 from ipc.router import router
 from engine.at_engine import ATCommandEngine
+from workers.gnss_decoder import info_payload, coord, fix_timestamp, GpsPublishFilter
 from modules.gps.module import GPSModule
 
-MPH_COUNTRIES = {"US", "GB", "UK", "LR", "MM"}
+# +CGPSINFO: ddmm.mmmm,N,dddmm.mmmm,E,date,utc,alt,speed,course
+_CGPSINFO_RE = re.compile(
+    rb"(\d{2})(\d+(?:\.\d+)?),([NS]),(\d{3})(\d+(?:\.\d+)?),([EW])"
+    rb"(?:,([^,]*))?(?:,([^,]*))?(?:,([^,]*))?(?:,([^,]*))?(?:,([^,]*))?"
+)
+
+# Shared no-fix payload. The only gps_update subscriber is the WebSocket bridge,
+# whose publish wrapper sets "__event__" to the same value every time
+_NO_FIX_MSG = {"fix": False}
+
+# (lat_min, lat_max, lon_min, lon_max, country, uses_mph) - first hit wins
+_BOXES = (
+    (24, 49, -125, -66, "US", True),
+    (49, 61, -8, 2, "GB", True),
+    (4, 9, -12, -7, "LR", True),
+    (9, 29, 92, 101, "MM", True),
+)
+
+def _scan_boxes(lat, lon):
+    for box in _BOXES:
+        if box[0] <= lat <= box[1] and box[2] <= lon <= box[3]:
+            return box
+    return None
+
+# 1x1 degree grid over the globe: 0 = no box touches the cell, else index+1 of
+# the first box covering it. A zero cell is a definite miss; a hit is confirmed
+# against the exact box (cells on a box edge are only partly inside).
+_GRID = bytearray(180 * 360)
+for _i in range(len(_BOXES) - 1, -1, -1):
+    _b = _BOXES[_i]
+    for _lat in range(_b[0], _b[1] + 1):
+        for _lon in range(_b[2], _b[3] + 1):
+            _GRID[(_lat + 90) * 360 + _lon + 180] = _i + 1
+del _i, _b, _lat, _lon
+
+def _match_box(lat, lon):
+    idx = (math.floor(lat) + 90) * 360 + math.floor(lon) + 180
+    if not 0 <= idx < len(_GRID):
+        return None
+    cell = _GRID[idx]
+    if not cell:
+        return None
+    box = _BOXES[cell - 1]
+    if box[0] <= lat <= box[1] and box[2] <= lon <= box[3]:
+        return box
+    return _scan_boxes(lat, lon)
 
 def detect_country_from_gps(lat, lon):
-    if 24 <= lat <= 49 and -125 <= lon <= -66:
-        return "US"
-    if 49 <= lat <= 61 and -8 <= lon <= 2:
-        return "GB"
-    if 4 <= lat <= 9 and -12 <= lon <= -7:
-        return "LR"
-    if 9 <= lat <= 29 and 92 <= lon <= 101:
-        return "MM"
-    return "OTHER"
+    box = _match_box(lat, lon)
+    return box[4] if box else "OTHER"
 
 
 class GPSWorker:
     INTERVAL = 2
 
-    def __init__(self, gps_module: GPSModule, gps_port="/dev/modem-gps"):
+    def __init__(self, gps_module: GPSModule, gps_port="/dev/modem-gps", shutdown=None):
         self.gps = gps_module
-        self.running = True
+        self._shutdown = shutdown or threading.Event()
         self.gps_port = gps_port
         self.engine = ATCommandEngine()
         self._gps_enabled = False
         self._connected = False
 
+        # Country rarely changes mid-drive; only re-detect once we leave the last box
+        self._last_box = None
+        self._last_country = None
+
+        # Last published fix, to drop identical gps_update frames
+        self._gps_pub = GpsPublishFilter()
+
     def start(self):
         logger.log("INFO", f"GPSWorker started (port: {self.gps_port})")
 
-        while self.running:
+        while not self._shutdown.is_set():
             try:
                 if self.read_gps_at():
-                    time.sleep(self.INTERVAL)
+                    self._shutdown.wait(self.INTERVAL)
                 else:
                     self.no_fix_warning()
-                    time.sleep(3)
+                    self._shutdown.wait(3)
             except Exception as e:
                 logger.log("ERROR", f"GPSWorker crash: {e}")
                 self._connected = False
-                time.sleep(3)
+                self._shutdown.wait(3)
 
     def stop(self):
-        self.running = False
+        self._shutdown.set()
 
     def read_gps_at(self):
         try:
@@ -60,47 +107,40 @@ class GPSWorker:
                 self._gps_enabled = True
                 logger.log("INFO", "GPS enabled")
 
-            resp = self.engine.send("AT+CGPSINFO")
+            resp = self.engine.send("AT+CGPSINFO", raw=True)
             if not resp:
                 return False
 
-            resp_text = "\n".join(resp)
-            match = re.search(r'\+CGPSINFO:\s*(.+)', resp_text)
-            if not match:
+            # Only the +CGPSINFO line is parsed; echoes and OK are skipped by prefix
+            data = info_payload(resp, b"+CGPSINFO:")
+            if data is None:
                 return False
 
-            data = match.group(1).strip()
-            parts = data.split(',')
-
-            if len(parts) < 4 or not parts[0]:
+            # No fix -> ",,,,,,,," which the regex rejects
+            m = _CGPSINFO_RE.match(data)
+            if not m:
                 return False
 
-            lat = self._nmea_to_decimal(parts[0], parts[1])
-            lon = self._nmea_to_decimal(parts[2], parts[3])
+            (lat_deg, lat_min, lat_hemi, lon_deg, lon_min, lon_hemi,
+             date_str, time_str, alt, speed_knots, heading) = m.groups()
 
-            if lat is None or lon is None:
-                return False
+            lat = coord(lat_deg, lat_min, lat_hemi)
+            lon = coord(lon_deg, lon_min, lon_hemi)
 
-            alt = float(parts[6]) if len(parts) > 6 and parts[6] else 0.0
-            speed_knots = float(parts[7]) if len(parts) > 7 and parts[7] else 0.0
-            heading = float(parts[8]) if len(parts) > 8 and parts[8] else 0.0
+            alt = float(alt) if alt else 0.0
+            speed_knots = float(speed_knots) if speed_knots else 0.0
+            heading = float(heading) if heading else 0.0
             speed_kmh = speed_knots * 1.852
 
-            date_str = parts[4] if len(parts) > 4 else ""
-            time_str = parts[5] if len(parts) > 5 else ""
-            timestamp = datetime.now(timezone.utc).isoformat()
-            if date_str and time_str:
-                try:
-                    time_clean = time_str.split(".")[0].ljust(6, "0")
-                    timestamp = datetime.strptime(date_str + time_clean, "%d%m%y%H%M%S").replace(tzinfo=timezone.utc).isoformat()
-                except:
-                    pass
+            timestamp = fix_timestamp(date_str, time_str) or datetime.now(timezone.utc).isoformat()
 
             logger.log("INFO", f"GPS fix: {lat:.6f}, {lon:.6f}, alt={alt}m")
             self.update_gps(lat, lon, alt, speed_kmh, 0, True, heading=heading, timestamp=timestamp)
             return True
 
-        except Exception as e:
+        except (OSError, ValueError) as e:
+            # SerialException is an OSError; ValueError covers malformed fields.
+            # Anything else is a bug and is left to the loop in start()
             logger.log("ERROR", f"GPS AT error: {e}")
             self._connected = False
             return False
@@ -111,6 +151,8 @@ class GPSWorker:
                 if self.engine.test():
                     logger.log("INFO", f"GPS connected to {self.gps_port}")
                     self._connected = True
+                    # AT+CGPS=1 once per connection; a replugged/reset modem comes back with GPS off
+                    self._gps_enabled = False
                     return True
                 self.engine.disconnect()
         except Exception as e:
@@ -120,41 +162,37 @@ class GPSWorker:
         return False
 
     def update_gps(self, lat, lon, alt, speed, satellites, fix, hdop=None, heading=None, timestamp=None):
-        country = detect_country_from_gps(lat, lon)
-        auto_unit = "mph" if country in MPH_COUNTRIES else "kmh"
-        self.gps.set_auto_unit(auto_unit)
-
-        self.gps.update_position(lat, lon, alt, hdop=hdop, heading=heading, timestamp=timestamp)
-        self.gps.update_speed(speed)
-        self.gps.update_fix(fix)
-        self.gps.satellites = satellites
+        box = self._last_box
+        if not (box and box[0] <= lat <= box[1] and box[2] <= lon <= box[3]):
+            box = self._last_box = _match_box(lat, lon)
+            country = box[4] if box else "OTHER"
+            if country != self._last_country:
+                self._last_country = country
+                self.gps.set_auto_unit("mph" if box and box[5] else "kmh")
+
+        had_fix = self.gps.fix
+        self.gps.update_all(lat, lon, alt, speed, satellites, fix,
+                            hdop=hdop, heading=heading, timestamp=timestamp)
+
+        # Module state above is always fresh; only the broadcast is deduplicated
+        spd, unit = self.gps.speed_and_unit()
+        if not self._gps_pub.moved(lat, lon, speed, (satellites, unit)) and had_fix == fix:
+            return
 
         router.publish("gps_update", {
             "latitude": lat,
             "longitude": lon,
             "altitude": alt,
-            "speed": self.gps.get_speed(),
-            "unit": self.gps.get_unit(),
+            "speed": spd,
+            "unit": unit,
             "satellites": satellites,
             "fix": fix,
             "heading": heading,
             "timestamp": timestamp
         })
 
-    def _nmea_to_decimal(self, value, direction):
-        if not value:
-            return None
-        try:
-            deg_len = 2 if direction in ["N", "S"] else 3
-            deg = float(value[:deg_len])
-            minutes = float(value[deg_len:])
-            dec = deg + (minutes / 60.0)
-            if direction in ["S", "W"]:
-                dec = -dec
-            return dec
-        except:
-            return None
-
     def no_fix_warning(self):
+        had_fix = self.gps.fix
         self.gps.update_fix(False)
-        router.publish("gps_update", {"fix": False})
+        if self._gps_pub.no_fix_due(had_fix):
+            router.publish("gps_update", _NO_FIX_MSG)
@@ -5,6 +5,7 @@
 import time
 import os
 import subprocess
+import threading
 from logger import logger
 from ipc.router import router
 from storage.storage_manager import StorageManager
@@ -12,14 +13,22 @@ from storage.storage_manager import StorageManager
 
 class LogsWorker:
     INTERVAL = 1  # seconds
+    MAX_LINES = 500  # cap per incremental read, so a long stall can't return an unbounded burst
 
-    def __init__(self, logs_module):
+    def __init__(self, logs_module, storage=None, shutdown=None):
         self.logs = logs_module
-        self.running = True
-        self.storage = StorageManager()
+        self._shutdown = shutdown or threading.Event()
+        # main passes its StorageManager so every worker shares one daily handle and ledger
+        self.storage = storage or StorageManager()
 
-        self.log_file = None
+        # Raw append-only fd of today's log; each poll is one os.write
+        self.log_fd = None
         self.current_date = None
+        # Wall-clock time of the next local midnight; no date formatting before it
+        self._rollover_at = 0
+
+        # journalctl cursor of the last entry handled; later reads start after it
+        self._cursor = None
 
         logger.log("INFO", "LogsWorker initialized")
 
@@ -27,77 +36,114 @@ class LogsWorker:
     def start(self):
         logger.log("INFO", "LogsWorker started")
 
-        while self.running:
+        while not self._shutdown.is_set():
             try:
                 self._rotate_if_needed()
                 self._read_journal_tail()
-                time.sleep(self.INTERVAL)
+                self._shutdown.wait(self.INTERVAL)
 
             except Exception as e:
                 logger.log("ERROR", f"LogsWorker crash: {e}")
-                time.sleep(2)
+                self._shutdown.wait(2)
 
     # ------------------------------------------------------------
     def stop(self):
-        self.running = False
-        if self.log_file:
-            try: self.log_file.close()
+        self._shutdown.set()
+        if self.log_fd is not None:
+            try: os.close(self.log_fd)
             except: pass
+            self.log_fd = None
 
     # ------------------------------------------------------------
     def _rotate_if_needed(self):
         """Rotate log file daily."""
-        today = time.strftime("%Y-%m-%d")
+        now = time.time()
+        # A deadline more than a day ahead means the clock was set back; recompute
+        if now < self._rollover_at <= now + 90000:
+            return
+
+        lt = time.localtime(now)
+        today = time.strftime("%Y-%m-%d", lt)
+        # mktime normalises mday + 1 past month end and picks up DST changes
+        self._rollover_at = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
 
         if today != self.current_date:
             self.current_date = today
 
             # close previous
-            if self.log_file:
-                try: self.log_file.close()
+            if self.log_fd is not None:
+                try: os.close(self.log_fd)
                 except: pass
+                self.log_fd = None
 
             # new file path
             path = self.storage.create_daily_log_file(today)
-            self.log_file = open(path, "a", buffering=1)
+            self.log_fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
             logger.log("INFO", f"LogsWorker: new log file {path}")
 
     # ------------------------------------------------------------
     def _read_journal_tail(self):
         """
-        Reads last lines of system journal:
-          journalctl -n 20 -o short
+        Reads new lines of system journal:
+          journalctl -n 20 -o short --show-cursor            (first read)
+          journalctl --after-cursor=<last> -n 500 -o short --show-cursor
         """
         try:
+            if self._cursor:
+                cmd = ["journalctl", f"--after-cursor={self._cursor}", "-n", str(self.MAX_LINES),
+                       "-o", "short", "--show-cursor"]
+            else:
+                cmd = ["journalctl", "-n", "20", "-o", "short", "--show-cursor"]
+
             out = subprocess.check_output(
-                ["journalctl", "-n", "20", "-o", "short"],
+                cmd,
                 stderr=subprocess.DEVNULL
             ).decode(errors="ignore")
 
-            for line in out.strip().split("\n"):
-                self._handle_line(line)
+            # One pass over the output; blank lines and journalctl markers are dropped
+            new_lines = []
+            for line in out.splitlines():
+                if line.startswith("-- "):
+                    # journalctl markers ("-- cursor: ...", "-- No entries --"), not log lines
+                    if line.startswith("-- cursor: "):
+                        self._cursor = line[11:].strip()
+                    continue
+                line = line.strip()
+                if line:
+                    new_lines.append(line)
+
+            self._handle_lines(new_lines)
+
+        except subprocess.CalledProcessError as e:
+            # e.g. "Failed to seek to cursor" after a journal vacuum/rotation:
+            # drop the cursor so the next poll starts over from the last 20 lines
+            if self._cursor:
+                self._cursor = None
+                logger.log("WARN", f"journalctl rejected saved cursor, restarting from tail: {e}")
+            else:
+                logger.log("ERROR", f"Failed reading system logs: {e}")
 
         except Exception as e:
             logger.log("ERROR", f"Failed reading system logs: {e}")
 
     # ------------------------------------------------------------
-    def _handle_line(self, line):
+    def _handle_lines(self, lines):
         """
-        Push line to:
+        Push one poll's lines to:
           - LogsModule (for UI)
-          - Disk log file
-          - IPC
+          - Disk log file (one write)
+          - IPC (one logs_update event)
         """
-        line = line.strip()
-        if not line:
+        if not lines:
             return
 
         # push to module buffer
-        self.logs.push(line)
+        for line in lines:
+            self.logs.push(line)
 
         # write to file
-        if self.log_file:
-            self.log_file.write(line + "\n")
+        if self.log_fd is not None:
+            os.write(self.log_fd, ("\n".join(lines) + "\n").encode())
 
         # notify listeners
-        router.publish("logs_update", {"line": line})
+        router.publish("logs_update", {"lines": lines})
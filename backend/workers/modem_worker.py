@@ -1,24 +1,66 @@
 import os
 import time
 import re
+import threading
+import socket
+import psutil
 from datetime import datetime, timezone
 from logger import logger
 from engine.at_engine import ATCommandEngine
+from workers.gnss_decoder import info_payload, coord, fix_timestamp, GpsPublishFilter
+from workers.port_scan import present_ports
 from ipc.router import router
 
 
+# +CGNSSINFO: mode,gps_svs,glonass_svs,beidou_svs,ddmm.mmmm,N,dddmm.mmmm,E,date,utc,alt,speed,course,pdop
+_CGNSSINFO_RE = re.compile(
+    rb"[^,]*,(\d*),(\d*),[^,]*,"
+    rb"(\d{2})(\d+(?:\.\d+)?),([NS]),(\d{3})(\d+(?:\.\d+)?),([EW]),"
+    rb"([^,]*),([^,]*)"
+    rb"(?:,([^,]*))?(?:,([^,]*))?(?:,([^,]*))?(?:,([^,]*))?"
+)
+
+# +CREG: <n>,<stat> -> registration state
+_CREG_STATES = {"0": "not registered", "1": "home", "2": "searching", "3": "denied", "5": "roaming"}
+
+# +CPSI system mode -> generation shown in the UI
+_MODE_GENERATION = {
+    "LTE": "4G",
+    "NR5G_SA": "5G",
+    "NR5G_NSA": "5G",
+    "WCDMA": "3G",
+    "GSM": "2G",
+}
+
+
 class ModemWorker:
     REFRESH = 5
     MODEM_INTERFACES = ["wwan0", "usb0", "eth1", "ppp0"]
+    _MODEM_IFACE_SET = frozenset(MODEM_INTERFACES)
+    AT_PORT_SCAN = [f"/dev/ttyUSB{i}" for i in range(0, 10)]
 
-    def __init__(self, module, config=None, gps_module=None):
+    def __init__(self, module, config=None, gps_module=None, shutdown=None):
         self.module = module
         self.config = config or {}
-        self.running = True
+        self._shutdown = shutdown or threading.Event()
         self.engine = ATCommandEngine()
         self.gps_module = gps_module
         self._gps_enabled = False
         self._data_connected = False
+
+        # ATI/ICCID/CIMI/GSN don't change while the modem stays attached;
+        # queried once per connection and dropped on reconnect or error
+        self._identity = None
+
+        # Last GPS cell / auto unit, so set_auto_unit runs only on change
+        self._last_cell = None
+        self._last_unit = None
+
+        # Last published fix, to drop identical gps_update frames
+        self._gps_pub = GpsPublishFilter()
+
+        # Cached /proc/net/dev fd for _get_data_usage
+        self._net_dev_fd = None
         
         # Subscribe to failover requests
         router.subscribe("modem_connect_request", self._handle_connect_request)
@@ -44,24 +86,38 @@ class ModemWorker:
     def start(self):
         logger.log("INFO", "ModemWorker started")
 
-        while self.running:
+        while not self._shutdown.is_set():
             try:
                 if not self._ensure_modem_connected():
-                    time.sleep(self.REFRESH)
+                    self._shutdown.wait(self.REFRESH)
                     continue
 
-                data = {}
-                id_info = self._get_modem_identity()
-                data.update(id_info)
-                sim_info = self._get_sim_info()
-                data.update(sim_info)
-                op_info = self._get_operator()
+                if self._identity is None:
+                    identity = self._get_modem_identity()
+                    identity.update(self._get_sim_info())
+                    # SIM may not be ready yet right after boot; keep asking until it is
+                    if identity["iccid"] and identity["imsi"] and identity["imei"]:
+                        self._identity = identity
+                else:
+                    identity = self._identity
+
+                data = dict(identity)
+                # Operator, registration and signal in one serial round-trip;
+                # on SIMCom the +CPSI line feeds both mode/band and RSRP/RSRQ/SINR
+                if hasattr(self, 'brand') and self.brand == "SIMCom":
+                    status = self._query("AT+COPS?", "AT+CREG?", "AT+CSQ", "AT+CPSI?")
+                    cpsi = status
+                else:
+                    status = self._query("AT+COPS?", "AT+CREG?", "AT+QCSQ")
+                    cpsi = self.engine.send("AT+CPSI?")
+
+                op_info = self._get_operator(status)
                 data.update(op_info)
-                mode_info = self._get_network_mode()
+                mode_info = self._get_network_mode(cpsi)
                 data.update(mode_info)
-                sig_info = self._get_signal()
+                sig_info = self._get_signal(status)
                 data.update(sig_info)
-                reg_info = self._get_registration()
+                reg_info = self._get_registration(status)
                 data.update(reg_info)
                 
                 # Get data usage
@@ -79,107 +135,122 @@ class ModemWorker:
 
             except Exception as e:
                 logger.log("ERROR", f"ModemWorker crash: {e}")
+                self._forget_modem()
                 self.module.update({"error": str(e), "connected": False})
 
-            time.sleep(self.REFRESH)
+            self._shutdown.wait(self.REFRESH)
 
     def stop(self):
-        self.running = False
+        self._shutdown.set()
 
     def _get_data_usage(self):
-        """Read data usage from network interface statistics (in MB)."""
-        for iface in self.MODEM_INTERFACES:
-            rx_path = f"/sys/class/net/{iface}/statistics/rx_bytes"
-            tx_path = f"/sys/class/net/{iface}/statistics/tx_bytes"
-            
-            if os.path.exists(rx_path) and os.path.exists(tx_path):
+        """Read data usage of the first active modem interface from /proc/net/dev (in MB)."""
+        # One pread of /proc/net/dev covers every interface; the fd stays open across
+        # polls (seq_file regenerates the table on each read from offset 0)
+        try:
+            if self._net_dev_fd is None:
+                self._net_dev_fd = os.open("/proc/net/dev", os.O_RDONLY)
+            buf = os.pread(self._net_dev_fd, 65536, 0)
+        except OSError as e:
+            logger.log("WARN", f"Failed to read /proc/net/dev: {e}")
+            if self._net_dev_fd is not None:
+                try: os.close(self._net_dev_fd)
+                except OSError: pass
+                self._net_dev_fd = None
+            return 0.0
+
+        # "  wwan0: rx_bytes rx_packets ... (8 rx fields) tx_bytes ..."
+        totals = {}
+        for line in buf.splitlines()[2:]:
+            name, _, fields = line.partition(b":")
+            name = name.strip().decode()
+            if name in self._MODEM_IFACE_SET:
+                f = fields.split()
                 try:
-                    with open(rx_path, 'r') as f:
-                        rx_bytes = int(f.read().strip())
-                    with open(tx_path, 'r') as f:
-                        tx_bytes = int(f.read().strip())
-                    
-                    total_bytes = rx_bytes + tx_bytes
-                    if total_bytes > 0:
-                        total_mb = round(total_bytes / (1024 * 1024), 2)
-                        logger.log("DEBUG", f"Data usage on {iface}: {total_mb} MB")
-                        return total_mb
-                except Exception as e:
-                    logger.log("WARN", f"Failed to read data usage from {iface}: {e}")
-        
+                    totals[name] = int(f[0]) + int(f[8])
+                except (IndexError, ValueError):
+                    logger.log("WARN", f"Failed to read data usage from {name}")
+
+        for iface in self.MODEM_INTERFACES:
+            total_bytes = totals.get(iface)
+            if total_bytes:
+                total_mb = round(total_bytes / (1024 * 1024), 2)
+                if logger.enabled_for("DEBUG"):
+                    logger.log("DEBUG", f"Data usage on {iface}: {total_mb} MB")
+                return total_mb
+
         return 0.0
 
     def _read_gps(self):
         """Read GPS via AT+CGNSSINFO"""
-        try:
-            if not self._gps_enabled:
-                self.engine.send("AT+CGPS=1")
-                self._gps_enabled = True
-                logger.log("INFO", "GPS enabled via ModemWorker")
+        # Transport failures are handled in send() (disconnect, empty response) and by
+        # the reconnect in start(); only the decode below is guarded here
+        if not self._gps_enabled:
+            self.engine.send("AT+CGPS=1")
+            self._gps_enabled = True
+            logger.log("INFO", "GPS enabled via ModemWorker")
+
+        resp = self.engine.send("AT+CGNSSINFO", raw=True)
+        if not resp:
+            self.gps_module.update_fix(False)
+            return
 
-            resp = self.engine.send("AT+CGNSSINFO")
-            if not resp:
+        # A malformed fix is a GPS problem, not a modem one: log it and keep the modem
+        try:
+            # Only the +CGNSSINFO line is parsed; echoes and OK are skipped by prefix
+            data = info_payload(resp, b"+CGNSSINFO:")
+            if data is None:
                 self.gps_module.update_fix(False)
                 return
 
-            resp_text = "\n".join(resp)
-            match = re.search(r'\+CGNSSINFO:\s*(.+)', resp_text)
-            if not match:
+            # No fix -> ",,,,,,,,,,,,,," which the regex rejects
+            m = _CGNSSINFO_RE.match(data)
+            if not m:
                 self.gps_module.update_fix(False)
                 return
 
-            data = match.group(1).strip()
-            parts = data.split(',')
+            (gps_sats, glonass_sats, lat_deg, lat_min, lat_hemi, lon_deg, lon_min, lon_hemi,
+             date_str, time_str, alt, speed_knots, heading, hdop) = m.groups()
 
-            if len(parts) < 10 or not parts[4]:
-                self.gps_module.update_fix(False)
-                return
+            satellites = (int(gps_sats) if gps_sats else 0) + (int(glonass_sats) if glonass_sats else 0)
 
-            gps_sats = int(parts[1]) if parts[1] else 0
-            glonass_sats = int(parts[2]) if parts[2] else 0
-            satellites = gps_sats + glonass_sats
+            lat = coord(lat_deg, lat_min, lat_hemi)
+            lon = coord(lon_deg, lon_min, lon_hemi)
 
-            lat = self._nmea_to_decimal(parts[4], parts[5])
-            lon = self._nmea_to_decimal(parts[6], parts[7])
+            alt = float(alt) if alt else 0.0
+            speed_knots = float(speed_knots) if speed_knots else 0.0
+            heading = float(heading) if heading else 0.0
+            hdop = float(hdop) if hdop else None
+            speed_kmh = speed_knots * 1.852
 
-            if lat is None or lon is None:
-                self.gps_module.update_fix(False)
-                return
+            timestamp = fix_timestamp(date_str, time_str) or datetime.now(timezone.utc).isoformat()
 
-            alt = float(parts[10]) if len(parts) > 10 and parts[10] else 0.0
-            speed_knots = float(parts[11]) if len(parts) > 11 and parts[11] else 0.0
-            heading = float(parts[12]) if len(parts) > 12 and parts[12] else 0.0
-            hdop = float(parts[13]) if len(parts) > 13 and parts[13] else None
-            speed_kmh = speed_knots * 1.852
+            had_fix = self.gps_module.fix
+            self.gps_module.update_all(lat, lon, alt, speed_kmh, satellites, True,
+                                       hdop=hdop, heading=heading, timestamp=timestamp)
 
-            date_str = parts[8] if len(parts) > 8 else ""
-            time_str = parts[9] if len(parts) > 9 else ""
-            timestamp = datetime.now(timezone.utc).isoformat()
-            if date_str and time_str:
-                try:
-                    time_clean = time_str.split(".")[0].ljust(6, "0")
-                    timestamp = datetime.strptime(date_str + time_clean, "%d%m%y%H%M%S").replace(tzinfo=timezone.utc).isoformat()
-                except:
-                    pass
-
-            self.gps_module.update_position(lat, lon, alt, hdop=hdop, heading=heading, timestamp=timestamp)
-            self.gps_module.update_speed(speed_kmh)
-            self.gps_module.update_fix(True)
-            self.gps_module.satellites = satellites
-
-            if 49 <= lat <= 61 and -8 <= lon <= 2:
-                self.gps_module.set_auto_unit("mph")
-            else:
-                self.gps_module.set_auto_unit("kmh")
+            # Re-evaluate the unit only when the fix moves to another 1-degree cell
+            cell = (int(lat // 1), int(lon // 1))
+            if cell != self._last_cell:
+                self._last_cell = cell
+                unit = "mph" if 49 <= lat <= 61 and -8 <= lon <= 2 else "kmh"
+                if unit != self._last_unit:
+                    self._last_unit = unit
+                    self.gps_module.set_auto_unit(unit)
 
             logger.log("INFO", f"GPS fix: {lat:.6f}, {lon:.6f}, {satellites} sats, alt={alt}m")
 
+            # Module state above is always fresh; only the broadcast is deduplicated
+            spd, unit = self.gps_module.speed_and_unit()
+            if not self._gps_pub.moved(lat, lon, speed_kmh, (satellites, unit)) and had_fix:
+                return
+
             router.publish("gps_update", {
                 "latitude": lat,
                 "longitude": lon,
                 "altitude": alt,
-                "speed": self.gps_module.get_speed(),
-                "unit": self.gps_module.get_unit(),
+                "speed": spd,
+                "unit": unit,
                 "satellites": satellites,
                 "hdop": hdop,
                 "fix": True,
@@ -188,27 +259,20 @@ class ModemWorker:
             })
 
         except Exception as e:
-            logger.log("ERROR", f"GPS read error: {e}")
+            logger.log("ERROR", f"GPS decode error: {e}")
             self.gps_module.update_fix(False)
 
-    def _nmea_to_decimal(self, value, direction):
-        if not value:
-            return None
-        try:
-            deg_len = 2 if direction in ["N", "S"] else 3
-            deg = float(value[:deg_len])
-            minutes = float(value[deg_len:])
-            dec = deg + (minutes / 60.0)
-            if direction in ["S", "W"]:
-                dec = -dec
-            return dec
-        except:
-            return None
+    def _forget_modem(self):
+        """Drop per-connection state so it is re-queried from the (possibly new) modem."""
+        self._identity = None
+        self._gps_enabled = False
 
     def _ensure_modem_connected(self):
         if self.engine.ser and self.engine.test():
             return True
 
+        self._forget_modem()
+
         modem_config = self.config.get("modem", {})
         config_port = modem_config.get("port")
 
@@ -225,10 +289,7 @@ class ModemWorker:
             return False
 
         logger.log("INFO", "Searching for modem AT port...")
-        for i in range(0, 10):
-            port = f"/dev/ttyUSB{i}"
-            if not os.path.exists(port):
-                continue
+        for port in present_ports(self.AT_PORT_SCAN):
             if self.engine.connect(port):
                 if self.engine.test():
                     self.module.at_port = port
@@ -257,59 +318,79 @@ class ModemWorker:
         return {"brand": brand, "model": model}
 
     def _get_sim_info(self):
+        # ATCommandEngine returns stripped lines, so prefixes anchor at position 0
         iccid = imsi = imei = None
         resp = self.engine.send("AT+ICCID")
         for line in resp:
-            if "+ICCID:" in line:
-                iccid = line.split(":")[1].strip()
+            if line.startswith("+ICCID:"):
+                iccid = line.partition(":")[2].strip()
+                break
         resp = self.engine.send("AT+CIMI")
         for line in resp:
             if line.isdigit():
-                imsi = line.strip()
+                imsi = line
+                break
         resp = self.engine.send("AT+GSN")
         for line in resp:
             if line.isdigit():
-                imei = line.strip()
+                imei = line
+                break
         return {"iccid": iccid, "imsi": imsi, "imei": imei}
 
-    def _get_operator(self):
-        resp = self.engine.send("AT+COPS?")
+    def _query(self, *commands):
+        """
+        Send several AT commands as one ';'-joined line and return all response lines.
+        If the modem rejects the batch, fall back to one send per command.
+        """
+        resp = self.engine.send("AT" + ";".join(c[2:] for c in commands))
+        if resp and "ERROR" in resp[-1]:
+            resp = []
+            for c in commands:
+                resp.extend(self.engine.send(c))
+        return resp
+
+    def _get_operator(self, resp):
         operator = None
         for line in resp:
-            if "+COPS:" in line:
+            if line.startswith("+COPS:"):
                 # +COPS: 0,0,"LycaMobile LycaMobile",7
-                match = re.search(r'"([^"]+)"', line)
-                if match:
-                    operator = match.group(1)
+                i = line.find('"')
+                j = line.find('"', i + 1) if i >= 0 else -1
+                if j > i + 1:
+                    operator = line[i + 1:j]
                     # Remove duplicate name if present
                     parts = operator.split()
                     if len(parts) == 2 and parts[0] == parts[1]:
                         operator = parts[0]
+                break
         return {"operator": operator}
 
-    def _get_registration(self):
-        resp = self.engine.send("AT+CREG?")
-        state_map = {"0": "not registered", "1": "home", "2": "searching", "3": "denied", "5": "roaming"}
+    def _get_registration(self, resp):
         status = None
         for line in resp:
-            if "+CREG:" in line:
+            if line.startswith("+CREG:"):
                 parts = line.split(",")
                 if len(parts) >= 2:
-                    status = state_map.get(parts[1], "unknown")
+                    status = _CREG_STATES.get(parts[1], "unknown")
+                break
         return {"registration": status}
 
-    def _get_network_mode(self):
-        resp = self.engine.send('AT+CPSI?')
+    def _get_network_mode(self, resp):
         mode = band = None
         for line in resp:
-            if "+CPSI:" in line:
+            if line.startswith("+CPSI:"):
                 parts = line.split(",")
-                if len(parts) >= 1:
-                    mode = parts[0].split(":")[1].strip()
+                mode = parts[0].partition(":")[2].strip()
                 if len(parts) >= 7:
                     band = parts[6]
+                break
         if mode:
-            if "LTE" in mode:
+            # Exact CPSI system modes resolve with one lookup; anything else
+            # falls through to the substring checks
+            gen = _MODE_GENERATION.get(mode)
+            if gen:
+                mode = gen
+            elif "LTE" in mode:
                 mode = "4G"
             elif "NR" in mode or "5G" in mode:
                 mode = "5G"
@@ -319,48 +400,43 @@ class ModemWorker:
                 mode = "2G"
         return {"network_mode": mode, "band": band}
 
-    def _get_signal(self):
+    def _get_signal(self, resp):
         rssi = rsrp = rsrq = sinr = None
         if hasattr(self, 'brand') and self.brand == "SIMCom":
-            resp = self.engine.send("AT+CSQ")
             for line in resp:
-                if "+CSQ:" in line:
-                    parts = line.split(":")
-                    if len(parts) >= 2:
-                        values = parts[1].strip().split(",")
-                        if len(values) >= 1:
-                            try:
-                                csq = int(values[0])
-                                if csq != 99:
-                                    rssi = -113 + (csq * 2)
-                            except:
-                                pass
-            # Get detailed signal from CPSI
-            resp = self.engine.send("AT+CPSI?")
+                if line.startswith("+CSQ:"):
+                    # +CSQ: <rssi>,<ber>
+                    try:
+                        csq = int(line.partition(":")[2].partition(",")[0])
+                        if csq != 99:
+                            rssi = -113 + (csq * 2)
+                    except ValueError:
+                        pass
+                    break
+            # Get detailed signal from the same CPSI line _get_network_mode used
             for line in resp:
-                if "+CPSI:" in line:
+                if line.startswith("+CPSI:"):
                     parts = line.split(",")
                     # +CPSI: LTE,Online,234-30,0x67F2,2871821,432,EUTRAN-BAND20,6225,2,-200,-1400,-709,12
                     if len(parts) >= 13:
                         try:
-                            rsrq = int(parts[9]) // 10 if parts[9] else None  # -200 -> -20
-                            rsrp = int(parts[10]) // 10 if parts[10] else None  # -1400 -> -140
-                            sinr = int(parts[12]) if parts[12] else None  # 12
-                        except:
+                            *_, rsrq_s, rsrp_s, _, sinr_s = parts[:13]
+                            rsrq = int(rsrq_s) // 10 if rsrq_s else None  # -200 -> -20
+                            rsrp = int(rsrp_s) // 10 if rsrp_s else None  # -1400 -> -140
+                            sinr = int(sinr_s) if sinr_s else None  # 12
+                        except ValueError:
                             pass
+                    break
         else:
-            resp = self.engine.send("AT+QCSQ")
             for line in resp:
-                if "+QCSQ:" in line:
+                if line.startswith("+QCSQ:"):
                     parts = line.split(",")
                     if len(parts) >= 5:
                         try:
-                            rssi = int(parts[1])
-                            rsrp = int(parts[2])
-                            rsrq = int(parts[3])
-                            sinr = int(parts[4])
-                        except:
+                            rssi, rsrp, rsrq, sinr = map(int, parts[1:5])
+                        except ValueError:
                             pass
+                    break
         return {"rssi": rssi, "rsrp": rsrp, "rsrq": rsrq, "sinr": sinr}
 
     # ----------------------------------------------------------------
@@ -397,7 +473,7 @@ class ModemWorker:
             resp = self.engine.send("AT+CREG?")
             registered = False
             for line in resp:
-                if "+CREG:" in line and ("1" in line or "5" in line):
+                if line.startswith("+CREG:") and ("1" in line or "5" in line):
                     registered = True
                     break
             
@@ -476,26 +552,20 @@ class ModemWorker:
 
     def _check_data_interface(self):
         """Check if modem data interface has an IP address."""
-        import subprocess
-        
+        # One netlink query instead of forking `ip addr show` per interface
+        try:
+            addrs = psutil.net_if_addrs()
+        except Exception:
+            return False
+
         for iface in self.MODEM_INTERFACES:
-            try:
-                result = subprocess.run(
-                    ["ip", "addr", "show", iface],
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                if result.returncode == 0 and "inet " in result.stdout:
-                    # Extract IP
-                    for line in result.stdout.split("\n"):
-                        if "inet " in line and "127." not in line:
-                            ip = line.strip().split()[1].split("/")[0]
-                            logger.log("INFO", f"ModemWorker: data interface {iface} has IP {ip}")
-                            self.module.update({"data_ip": ip, "data_interface": iface})
-                            return True
-            except:
-                continue
-        
+            for addr in addrs.get(iface, ()):
+                if addr.family == socket.AF_INET and not addr.address.startswith("127."):
+                    ip = addr.address
+                    logger.log("INFO", f"ModemWorker: data interface {iface} has IP {ip}")
+                    self.module.update({"data_ip": ip, "data_interface": iface})
+                    return True
+
         return False
 
     def is_data_connected(self):
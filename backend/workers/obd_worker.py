@@ -8,6 +8,7 @@ import serial
 from logger import logger
 from ipc.router import router
 from workers.obd_pid_decoder import PIDDecoder
+from workers.port_scan import present_ports
 
 
 class OBDWorker:
@@ -197,10 +198,7 @@ class OBDWorker:
 
     def _ensure_connection(self):
         """Find ELM327 and initialize it."""
-        for port in self.PORT_SCAN:
-            if not os.path.exists(port):
-                continue
-
+        for port in present_ports(self.PORT_SCAN):
             for baud in self.BAUD_RATES:
                 try:
                     self.ser = serial.Serial(port, baud, timeout=1)
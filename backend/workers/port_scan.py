@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# Serial port presence checks for ADA-Pi workers
+# Device nodes are looked up in a cached /dev listing that is refreshed only
+# when /dev's mtime changes (a node was added or removed), instead of one
+# stat() per candidate port on every reconnect attempt.
+
+import os
+
+_DEV = "/dev"
+_dev_cache = (None, frozenset())   # (st_mtime_ns, names)
+
+
+def present_ports(paths):
+    """Return the entries of `paths` that currently exist, in order."""
+    global _dev_cache
+
+    try:
+        mtime = os.stat(_DEV).st_mtime_ns
+    except OSError:
+        return [p for p in paths if os.path.exists(p)]
+
+    cached_mtime, names = _dev_cache
+    if mtime != cached_mtime:
+        names = frozenset(os.listdir(_DEV))
+        _dev_cache = (mtime, names)
+
+    found = []
+    for p in paths:
+        parent, _, name = p.rpartition("/")
+        if parent == _DEV:
+            if name in names:
+                found.append(p)
+        elif os.path.exists(p):
+            found.append(p)
+    return found
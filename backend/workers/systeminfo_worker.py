@@ -22,24 +22,86 @@ class SystemInfoWorker:
         self.system = system_module
         self.running = True
 
+        # procfs/sysfs regenerate on every read, so keep the fds open
+        # and re-read them from offset 0 with pread each tick
+        self._fd_temp = self._open_ro("/sys/class/thermal/thermal_zone0/temp")
+        self._fd_uptime = self._open_ro("/proc/uptime")
+        self._fd_meminfo = self._open_ro("/proc/meminfo")
+        # One scratch buffer for all of them; values are parsed through a
+        # memoryview of it, so a tick allocates no read buffers
+        self._buf = bytearray(4096)
+        self._view = memoryview(self._buf)
+
+        # OS release and kernel only change across reboots/upgrades: read them once
+        self.system.update(os_version=self._read_os_once(), kernel=self._read_kernel_once())
+
     # ------------------------------------------------------------
 
     def start(self):
         logger.log("INFO", "SystemInfoWorker started.")
 
+        monotonic = time.monotonic
+        sleep = time.sleep
+        interval = self.INTERVAL
+
+        # Schedule against absolute targets so work time doesn't drift the cadence
+        next_tick = monotonic()
+
         while self.running:
             try:
                 self.update_system_info()
-                time.sleep(self.INTERVAL)
+                next_tick += interval
+                sleep(max(0, next_tick - monotonic()))
             except Exception as e:
                 logger.log("ERROR", f"SystemInfoWorker crashed: {e}")
-                time.sleep(1)
+                sleep(1)
+                next_tick = monotonic()
 
     # ------------------------------------------------------------
 
     def stop(self):
         self.running = False
 
+        for name in ("_fd_temp", "_fd_uptime", "_fd_meminfo"):
+            fd = getattr(self, name)
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                setattr(self, name, None)
+
+    @staticmethod
+    def _read_os_once():
+        try:
+            with open("/etc/os-release") as f:
+                text = f.read()
+        except OSError:
+            return "Unknown OS"
+
+        _, found, rest = text.partition("PRETTY_NAME=")
+        if not found:
+            return "Unknown OS"
+        return rest.partition("\n")[0].strip().replace('"', "") or "Unknown OS"
+
+    @staticmethod
+    def _read_kernel_once():
+        try:
+            return os.uname().release
+        except Exception:
+            return "Unknown Kernel"
+
+    @staticmethod
+    def _open_ro(path):
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def _pread(self, fd):
+        """Re-read `fd` from offset 0 into the scratch buffer; returns the byte count."""
+        return os.preadv(fd, [self._buf], 0)
+
     # ------------------------------------------------------------
 
     def update_system_info(self):
@@ -49,14 +111,14 @@ class SystemInfoWorker:
 
         cpu_temp = self.get_cpu_temp()
         cpu_usage = self.get_cpu_load()
-        mem_info = self.get_mem_usage()
-        disk_info = self.get_disk_usage()
+
+        # RAM/disk are written straight into the module's existing dicts
+        self.get_mem_usage(self.system.ram)
+        self.get_disk_usage(self.system.disk)
 
         payload = {
             "cpu_temp": cpu_temp,
             "cpu_usage": cpu_usage,
-            "ram": mem_info,
-            "disk": disk_info,
             "uptime": self.get_uptime(),
             "load": os.getloadavg(),
         }
@@ -78,8 +140,8 @@ class SystemInfoWorker:
         """
 
         try:
-            with open("/sys/class/thermal/thermal_zone0/temp") as f:
-                return round(int(f.read()) / 1000, 1)
+            n = self._pread(self._fd_temp)
+            return round(int(self._view[:n]) / 1000, 1)
         except:
             return 0.0
 
@@ -97,30 +159,33 @@ class SystemInfoWorker:
 
     # ------------------------------------------------------------
 
-    def get_mem_usage(self):
-        """Read memory usage from /proc/meminfo."""
+    def get_mem_usage(self, out):
+        """Fill `out` in place with memory usage from /proc/meminfo."""
 
         try:
-            info = {}
-            with open("/proc/meminfo") as f:
-                for line in f:
-                    key, value, _ = line.split()
-                    info[key] = int(value)
-
-            total = info.get("MemTotal", 0) // 1024
-            free = info.get("MemAvailable", 0) // 1024
+            n = self._pread(self._fd_meminfo)
+            total = self._meminfo_kb(n, b"MemTotal:") // 1024
+            free = self._meminfo_kb(n, b"MemAvailable:") // 1024
             used = total - free
             percent = round((used / total) * 100, 1) if total else 0.0
-
-            return {
-                "total": total,
-                "used": used,
-                "free": free,
-                "percent": percent,
-            }
-
         except Exception:
-            return {"total": 0, "used": 0, "free": 0, "percent": 0.0}
+            total = used = free = 0
+            percent = 0.0
+
+        out["total"] = total
+        out["used"] = used
+        out["free"] = free
+        out["percent"] = percent
+        return out
+
+    def _meminfo_kb(self, n, key):
+        """Value of one "Key:   1234 kB" line of the meminfo read into the buffer (0 if missing)."""
+        buf = self._buf
+        i = buf.find(key, 0, n)
+        if i < 0:
+            return 0
+        start = i + len(key)
+        return int(self._view[start:buf.find(b"kB", start, n)])
 
     # ------------------------------------------------------------
 
@@ -128,15 +193,15 @@ class SystemInfoWorker:
         """Return uptime in seconds."""
 
         try:
-            with open("/proc/uptime") as f:
-                return int(float(f.read().split()[0]))
+            n = self._pread(self._fd_uptime)
+            return int(float(self._view[:self._buf.find(b" ", 0, n)]))
         except Exception:
             return 0
 
     # ------------------------------------------------------------
 
-    def get_disk_usage(self):
-        """Return total/used disk space (MB) for root filesystem."""
+    def get_disk_usage(self, out):
+        """Fill `out` in place with total/used disk space (MB) for root filesystem."""
 
         try:
             st = os.statvfs("/")
@@ -144,6 +209,12 @@ class SystemInfoWorker:
             free = (st.f_bavail * st.f_frsize) // (1024 * 1024)
             used = total - free
             percent = round((used / total) * 100, 1) if total else 0.0
-            return {"total": total, "used": used, "free": free, "percent": percent}
         except Exception:
-            return {"total": 0, "used": 0, "free": 0, "percent": 0.0}
+            total = used = free = 0
+            percent = 0.0
+
+        out["total"] = total
+        out["used"] = used
+        out["free"] = free
+        out["percent"] = percent
+        return out
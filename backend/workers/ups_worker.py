@@ -274,8 +274,9 @@ class UPSWorker:
                 temperature=temperature
             )
 
-            logger.log("DEBUG", f"WittyPi: Vin={voltage_in:.2f}V, Vout={voltage_out:.2f}V, "
-                                f"Iout={current_out:.2f}A, {percent}%, charging={charging}")
+            if logger.enabled_for("DEBUG"):
+                logger.log("DEBUG", f"WittyPi: Vin={voltage_in:.2f}V, Vout={voltage_out:.2f}V, "
+                                    f"Iout={current_out:.2f}A, {percent}%, charging={charging}")
 
         except Exception as e:
             logger.log("WARN", f"WittyPi read failed: {e}")